@@ -0,0 +1,247 @@
+"""
+Group: Controller Liberators
+Benchmark suite of the hot loop components, driven by deterministic synthetic inputs.
+
+Covers PoseControlMapper feature extraction, GUI overlay rendering (on pygame's dummy video driver), the
+KeyboardController against a fake pynput Controller and PresetManager.load_presets. Every benchmark reports
+ops/sec and per-call latency, and is compared against a stored baseline: a benchmark slower than the baseline
+by more than the tolerance is reported as a regression and the script exits with status 1. Baselines are
+machine-specific and therefore not shipped: without one (or with benchmarks missing from it) nothing can be
+compared, and the script exits with status 2 until a baseline is saved on the machine.
+The suite needs no display, tkparam window or pynput, so it runs headless, e.g. in CI.
+
+Usage:
+    python benchmark.py                     # run and compare against Benchmarks/baseline.json
+    python benchmark.py --save-baseline     # store the results as the new baseline of this machine (exit status 0)
+    python benchmark.py -k mapper           # only run benchmarks whose name contains 'mapper'
+"""
+
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")  # render off-screen, must be set before pygame starts
+
+import argparse
+import configparser
+import contextlib
+import copy
+import io
+import json
+import math
+import sys
+from time import perf_counter
+from typing import Callable, Dict, List, Tuple
+import numpy as np
+
+DEFAULT_BASELINE = os.path.join("Benchmarks", "baseline.json")
+NUM_INPUTS = 256  # distinct synthetic inputs each benchmark cycles through
+SEED = 20240601
+
+
+class FakeKeyboard:
+    """
+    Stand-in for pynput.keyboard.Controller counting key events instead of sending them.
+    """
+
+    def __init__(self):
+        self.events: int = 0
+
+    def press(self, key):
+        self.events += 1
+
+    def release(self, key):
+        self.events += 1
+
+
+class _FakeLandmark:
+    __slots__ = ("x", "y", "z", "visibility")
+
+    def __init__(self, x, y, z, visibility):
+        self.x, self.y, self.z, self.visibility = x, y, z, visibility
+
+
+class _FakeLandmarkList:
+    """Duck-typed stand-in for MediaPipe's NormalizedLandmarkList."""
+
+    def __init__(self, array: np.ndarray):
+        self.landmark = [_FakeLandmark(*row) for row in array.tolist()]
+
+
+def synthetic_landmarks(n: int, seed: int = SEED) -> np.ndarray:
+    """
+    Generate (n, 33, 4) landmark arrays of two fists holding a virtual wheel, sweeping the steering angle and
+    the fist distance across the steering, brake and throttle ranges.
+    """
+    from mapping import PoseControlMapper
+
+    rng = np.random.default_rng(seed)
+    lms = rng.uniform(0.2, 0.8, size=(n, 33, 4)).astype(np.float32)
+    lms[:, :, 3] = rng.uniform(0.5, 1.0, size=(n, 33))
+    angles = np.radians(np.linspace(-70.0, 70.0, n))
+    radii = 0.05 + 0.3 * (0.5 + 0.5 * np.sin(np.linspace(0.0, 6.0 * math.pi, n)))
+    for i in range(n):
+        dx, dy = radii[i] * math.cos(angles[i]), radii[i] * math.sin(angles[i])
+        for indices, sign in ((PoseControlMapper.left_hand_indices, 1.0), (PoseControlMapper.right_hand_indices, -1.0)):
+            jitter = rng.normal(0.0, 0.005, size=(len(indices), 2))
+            lms[i, indices, 0] = 0.5 + sign * dx + jitter[:, 0]
+            lms[i, indices, 1] = 0.5 + sign * dy + jitter[:, 1]
+    return lms
+
+
+def _cycle(items: List) -> Callable:
+    """Return a function yielding the items round-robin."""
+    state = {"i": 0}
+    n = len(items)
+
+    def nxt():
+        i = state["i"]
+        state["i"] = i + 1 if i + 1 < n else 0
+        return items[i]
+    return nxt
+
+
+def run_benchmark(fn: Callable, min_time: float, min_calls: int = 50, warmup: int = 20) -> Dict[str, float]:
+    """
+    Call fn repeatedly for at least min_time seconds and return its throughput and latency statistics.
+    """
+    for _ in range(warmup):
+        fn()
+    latencies = []
+    start = perf_counter()
+    while True:
+        t = perf_counter()
+        fn()
+        latencies.append(perf_counter() - t)
+        if len(latencies) >= min_calls and perf_counter() - start >= min_time:
+            break
+    lat = np.array(latencies) * 1e6
+    return {
+        "calls": len(lat),
+        "ops_per_sec": len(lat) / (lat.sum() / 1e6),
+        "mean_us": float(lat.mean()),
+        "p50_us": float(np.percentile(lat, 50)),
+        "p99_us": float(np.percentile(lat, 99)),
+    }
+
+
+def build_benchmarks() -> Tuple[Dict[str, Callable], Callable]:
+    """
+    Initialize the components the same way main.py does.
+    :return: ({benchmark name: callable}, function releasing the components)
+    """
+    from context import Context
+    from presets import PresetManager
+    from mapping import PoseControlMapper
+    from gui import GUI
+    from landmarks import LandmarkArray
+    from control.keyboard import KeyboardController
+
+    config = configparser.ConfigParser()
+    config.read('sysconfig.ini')
+    ctx = Context(config, tkparam=False)  # tunable parameters are plain values loaded from the presets
+    preset_mgr = PresetManager(ctx)
+    gui = GUI(ctx, (640, 480), 0)
+    mapper = PoseControlMapper(ctx)
+    ctx.gamepad = KeyboardController(keyboard=FakeKeyboard())
+    with contextlib.redirect_stdout(io.StringIO()):
+        preset_mgr.load_presets()
+    gui.calibration_mode = True
+
+    lms = synthetic_landmarks(NUM_INPUTS)
+    arrays = [LandmarkArray(lm) for lm in lms]
+    protos = [_FakeLandmarkList(lm) for lm in lms]
+    feats = [copy.copy(mapper.extract_features(a)) for a in arrays]
+    controls = [(f.right_pressure - f.left_pressure, f.throttle_pressure, f.brake_pressure) for f in feats]
+
+    next_array, next_proto, next_feat, next_control = _cycle(arrays), _cycle(protos), _cycle(feats), _cycle(controls)
+    batch = np.tile(lms, (4, 1, 1))  # 1024 frames
+    keyboard = ctx.gamepad
+
+    def keyboard_controls():
+        steer, throttle, brake = next_control()
+        keyboard.steer(steer)
+        keyboard.throttle(throttle)
+        keyboard.brake(brake)
+
+    def load_presets():
+        with contextlib.redirect_stdout(io.StringIO()):
+            preset_mgr.load_presets()
+
+    def close():
+        ctx.gamepad.close()
+        ctx.close()
+        gui.quit()
+
+    return {
+        "mapper.extract_features[array]": lambda: mapper.extract_features(next_array()),
+        "mapper.extract_features[proto]": lambda: mapper.extract_features(next_proto()),
+        "mapper.extract_features_batch[1024]": lambda: mapper.extract_features_batch(batch),
+        "gui.render_pose_features": lambda: gui.render_pose_features(next_feat()),
+        "gui.render_game_controls": lambda: gui.render_game_controls(next_feat()),
+        "keyboard.steer_throttle_brake": keyboard_controls,
+        "presets.load_presets": load_presets,
+    }, close
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], tolerance: float) -> List[str]:
+    """Return the names of benchmarks slower than the baseline by more than the tolerance."""
+    regressions = []
+    for name, row in results.items():
+        base = baseline.get(name)
+        if base and row["ops_per_sec"] < base["ops_per_sec"] * (1.0 - tolerance):
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Controller Liberator benchmark suite")
+    parser.add_argument("-k", dest="filter", default="", help="only run benchmarks whose name contains this")
+    parser.add_argument("--min-time", type=float, default=1.0, help="seconds spent per benchmark")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="store the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed throughput drop against the baseline, 0.25 = 25%%")
+    args = parser.parse_args()
+
+    benchmarks, close = build_benchmarks()
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+
+    results = {}
+    print(f"{'benchmark':<40}{'ops/sec':>12}{'mean us':>10}{'p50 us':>10}{'p99 us':>10}{'vs base':>9}")
+    for name, fn in benchmarks.items():
+        if args.filter not in name:
+            continue
+        row = results[name] = run_benchmark(fn, args.min_time)
+        base = baseline.get(name)
+        ratio = f"{row['ops_per_sec'] / base['ops_per_sec']:>8.2f}x" if base else f"{'-':>9}"
+        print(f"{name:<40}{row['ops_per_sec']:>12.0f}{row['mean_us']:>10.1f}{row['p50_us']:>10.1f}"
+              f"{row['p99_us']:>10.1f}{ratio}")
+    close()
+
+    if args.save_baseline:
+        baseline.update(results)
+        os.makedirs(os.path.dirname(args.baseline) or ".", exist_ok=True)
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2)
+        print(f"Saved baseline: {args.baseline}")
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\nPERFORMANCE REGRESSION (> {args.tolerance:.0%} slower than baseline):")
+        for name in regressions:
+            print(f"  {name}")
+        return 1
+    missing = [name for name in results if name not in baseline]
+    if missing:
+        print(f"\nNOT COMPARED: no baseline for {len(missing)} of {len(results)} benchmarks in {args.baseline}:")
+        for name in missing:
+            print(f"  {name}")
+        print("Run with --save-baseline on this machine to create one")
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
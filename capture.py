@@ -0,0 +1,141 @@
+"""
+Group: Controller Liberators
+Threaded frame capture stage placed in front of the main loop.
+
+The CaptureWorker owns the cv2.VideoCapture and keeps grabbing frames on a background thread into a small
+ring buffer, so the sensor/driver wait overlaps with pose inference instead of adding up serially. The main loop
+only ever receives the newest frame; older frames that were never consumed are dropped and counted.
+
+Usage:
+    from capture import CaptureWorker
+
+    worker = CaptureWorker(cv2.VideoCapture(0), buffer_size=2)
+    worker.start()
+    ret, frame = worker.read()
+    print(worker.dropped_frames, worker.frame_age)
+
+With a FramePool, frames are read into pooled buffers, and frames dropped from the ring buffer are handed back to
+the pool; the consumer releases the frames it received.
+"""
+
+from collections import deque
+from threading import Thread, Condition
+from time import perf_counter
+from typing import Optional, Tuple
+
+from frame_pool import FramePool
+
+
+class CaptureWorker:
+    """
+    Background capture thread handing out only the latest frame.
+    """
+
+    def __init__(self, camera, buffer_size: int = 2, read_timeout: float = 1.0, pool: Optional[FramePool] = None):
+        """
+        :param camera: opened cv2.VideoCapture (or any object providing read() and release())
+        :param buffer_size: number of frames kept in the ring buffer, older frames are dropped
+        :param read_timeout: seconds between warnings while read() waits for a frame, e.g. for a slow camera start
+        :param pool: frame buffer pool to read frames into, the camera must accept read(image)
+        """
+        self.camera = camera
+        self.pool: Optional[FramePool] = pool
+        self.read_timeout: float = read_timeout
+        self._buffer: deque = deque(maxlen=max(1, buffer_size))  # (frame, capture timestamp)
+        self._cond = Condition()
+        self._thread: Optional[Thread] = None
+        self._is_running: bool = False
+        self._ended: bool = False  # camera stopped delivering frames
+
+        self.captured_frames: int = 0  # frames grabbed from the camera
+        self.consumed_frames: int = 0  # frames handed to the main loop
+        self.dropped_frames: int = 0  # frames overwritten or skipped before being consumed
+        self.stalls: int = 0  # read_timeout periods read() waited without a frame
+        self.frame_age: float = 0.0  # seconds between capture and hand-off of the last consumed frame
+        self.frame_timestamp: float = 0.0  # perf_counter timestamp of the last consumed frame
+
+    def start(self) -> "CaptureWorker":
+        """Start the capture thread."""
+        if self._is_running:
+            return self
+        self._is_running = True
+        self._thread = Thread(target=self._capture_loop, name="CaptureWorker", daemon=True)
+        self._thread.start()
+        return self
+
+    def _capture_loop(self) -> None:
+        try:
+            self.__capture_frames()
+        finally:
+            with self._cond:
+                self._ended = True  # also if the camera raised, so that read() does not wait forever
+                self._cond.notify_all()
+
+    def __capture_frames(self) -> None:
+        pool = self.pool
+        while self._is_running:
+            if pool is not None:
+                buf = pool.acquire()
+                ret, frame = self.camera.read(buf)
+                pool.check(buf, frame)
+            else:
+                ret, frame = self.camera.read()
+            timestamp = perf_counter()
+            with self._cond:
+                if not ret:
+                    break
+                if len(self._buffer) == self._buffer.maxlen:
+                    self.dropped_frames += 1  # oldest frame is pushed out of the ring buffer
+                    if pool is not None:
+                        pool.release(self._buffer.popleft()[0])
+                self._buffer.append((frame, timestamp))
+                self.captured_frames += 1
+                self._cond.notify_all()
+
+    def read(self) -> Tuple[bool, Optional[object]]:
+        """
+        Block until a frame is available and return the newest one, dropping any older buffered frames.
+        Keeps the (ret, frame) contract of cv2.VideoCapture.read(), ret is only False once the camera stopped
+        delivering frames.
+        """
+        with self._cond:
+            while not self._buffer and not self._ended:
+                if not self._cond.wait_for(lambda: self._buffer or self._ended, timeout=self.read_timeout):
+                    self.stalls += 1
+                    print(f"No frame from the camera for {self.stalls * self.read_timeout:.0f} s, still waiting")
+            if not self._buffer:
+                return False, None
+
+            frame, timestamp = self._buffer.pop()
+            self.dropped_frames += len(self._buffer)
+            if self.pool is not None:
+                for dropped, _ in self._buffer:
+                    self.pool.release(dropped)
+            self._buffer.clear()
+
+        self.consumed_frames += 1
+        self.frame_timestamp = timestamp
+        self.frame_age = perf_counter() - timestamp
+        return True, frame
+
+    def stats(self) -> dict:
+        """Return capture counters."""
+        return {
+            "captured": self.captured_frames,
+            "consumed": self.consumed_frames,
+            "dropped": self.dropped_frames,
+            "stalls": self.stalls,
+            "frame_age_ms": self.frame_age * 1000.0,
+        }
+
+    def stop(self) -> None:
+        """Stop the capture thread without releasing the camera."""
+        self._is_running = False
+        if self._thread is not None:
+            self._thread.join(timeout=self.read_timeout)
+            self._thread = None
+
+    def release(self) -> None:
+        """Stop the capture thread and release the camera."""
+        self.stop()
+        self.camera.release()
@@ -0,0 +1,135 @@
+"""
+Group: Controller Liberators
+Adaptive MediaPipe model complexity.
+
+AdaptiveComplexity measures the rolling inference time and tracking confidence of the pose detector and switches
+between the light (0), standard (1) and heavy (2) pose models to stay within a target frame budget. Switching
+uses hysteresis: a cooldown after every switch, a downgrade only when the budget is exceeded, and an upgrade
+only when the (measured or estimated) cost of the heavier model fits into the budget with a margin. Measurements
+of a model not in use expire, so a load that was too high once does not rule out the heavier model for good. The
+replacement Pose instance is built on a background thread and swapped in by the detector once ready, so a switch
+never stalls the main loop.
+"""
+
+from collections import deque
+from threading import Thread
+from typing import Callable, Dict, Optional, Tuple
+
+MIN_COMPLEXITY = 0
+MAX_COMPLEXITY = 2
+
+COST_RATIO = {0: 1.6, 1: 3.0}
+"""Rough inference cost of complexity c+1 relative to complexity c, used until it has been measured"""
+
+
+class AdaptiveComplexity:
+    """
+    Pick the pose model complexity at runtime from the measured inference time.
+    """
+
+    def __init__(self, pose_factory: Callable[[int], object], complexity: int, target_ms: float,
+                 window: int = 30, cooldown: int = 90, upgrade_margin: float = 0.8, low_confidence: float = 0.6,
+                 measurement_ttl: int = 900):
+        """
+        :param pose_factory: function building a MediaPipe Pose instance of the given complexity
+        :param complexity: complexity of the pose instance currently in use
+        :param target_ms: inference time budget per frame in milliseconds
+        :param window: number of frames of the rolling averages
+        :param cooldown: frames to wait after a switch before considering the next one
+        :param upgrade_margin: upgrade only if the heavier model is expected to use less than this part of the budget
+        :param low_confidence: below this rolling tracking confidence, upgrades may use the whole budget
+        :param measurement_ttl: frames after which the measured time of a model not in use is no longer trusted and
+            the heavier model is estimated from the current one again
+        """
+        self.pose_factory = pose_factory
+        self.complexity: int = complexity
+        self.target_ms: float = target_ms
+        self.cooldown: int = cooldown
+        self.upgrade_margin: float = upgrade_margin
+        self.low_confidence: float = low_confidence
+        self.measurement_ttl: int = measurement_ttl
+
+        self._times: deque = deque(maxlen=window)
+        self._confidences: deque = deque(maxlen=window)
+        self._frames_since_switch: int = 0
+        self.measured_ms: Dict[int, float] = {}  # last rolling inference time measured per complexity
+        self._measured_at: Dict[int, int] = {}  # frame number of the measurement per complexity
+        self._frame: int = 0
+
+        self._builder: Optional[Thread] = None
+        self._ready: Optional[Tuple[object, int]] = None  # (pose, complexity) built in the background
+        self.switch_count: int = 0
+
+    @property
+    def mean_ms(self) -> float:
+        return sum(self._times) / len(self._times) if self._times else 0.0
+
+    @property
+    def mean_confidence(self) -> float:
+        return sum(self._confidences) / len(self._confidences) if self._confidences else 0.0
+
+    def record(self, inference_ms: float, confidence: float) -> None:
+        """
+        Record the inference time and tracking confidence (0 if no pose was found) of one frame.
+        """
+        self._times.append(inference_ms)
+        self._confidences.append(confidence)
+        self._frames_since_switch += 1
+        self._frame += 1
+        if self._builder is not None or self._frames_since_switch < self.cooldown:
+            return
+        if len(self._times) < self._times.maxlen:
+            return
+
+        mean = self.mean_ms
+        self.measured_ms[self.complexity] = mean
+        self._measured_at[self.complexity] = self._frame
+        if mean > self.target_ms and self.complexity > MIN_COMPLEXITY:
+            self._build(self.complexity - 1)
+        elif self.complexity < MAX_COMPLEXITY:
+            heavier = self.complexity + 1
+            estimate = mean * COST_RATIO[self.complexity]
+            if heavier in self.measured_ms and self._frame - self._measured_at[heavier] <= self.measurement_ttl:
+                estimate = self.measured_ms[heavier]
+            margin = 1.0 if self.mean_confidence < self.low_confidence else self.upgrade_margin
+            if estimate < self.target_ms * margin:
+                self._build(self.complexity + 1)
+
+    def _build(self, complexity: int) -> None:
+        """Build the pose instance of the new complexity on a background thread."""
+        def build():
+            try:
+                self._ready = (self.pose_factory(complexity), complexity)
+            except Exception as e:
+                print(f"Cannot build pose model of complexity {complexity}: {e}")
+                self._frames_since_switch = 0
+                self._builder = None
+
+        self._builder = Thread(target=build, name="PoseBuilder", daemon=True)
+        self._builder.start()
+
+    def poll(self) -> Optional[object]:
+        """
+        Return the new pose instance once built in the background, the caller swaps it in and closes the old one.
+        """
+        if self._ready is None:
+            return None
+        pose, complexity = self._ready
+        self._ready = None
+        self._builder = None
+        print(f"Model complexity: {self.complexity} -> {complexity} (inference {self.mean_ms:.1f}ms, "
+              f"target {self.target_ms:.1f}ms)")
+        self.complexity = complexity
+        self.switch_count += 1
+        self._frames_since_switch = 0
+        self._times.clear()
+        self._confidences.clear()
+        return pose
+
+    def close(self) -> None:
+        """Wait for a pending build and release the instance it produced."""
+        if self._builder is not None:
+            self._builder.join()
+        if self._ready is not None:
+            self._ready[0].close()
+            self._ready = None
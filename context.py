@@ -2,25 +2,30 @@
 Group: Controller Liberators
 """
 from utils import check_os
-if check_os() != "Darwin":
-    from tkparam import TKParamWindow
 
 
 class Context:
     """
     Application context storing component references.
     """
-    def __init__(self, config):
+    def __init__(self, config, tkparam: bool = True):
+        """
+        :param config: sysconfig.ini configuration
+        :param tkparam: open the tkparam calibration window (never on macOS), without it tunable parameters are
+            plain values loaded from the presets, e.g. in headless mode
+        """
         self.cfg = config  # configuration object reference
         self.detector = None  # pose detector instance
         self.gui = None  # GUI window reference
         self.preset_mgr = None  # GUI settings reference
         self.mapper = None  # pose-control mapper instance
+        self.landmark_filter = None  # landmark filtering stage between detector and mapper
         self.gamepad = None  # virtual gamepad reference
-        if check_os() != "Darwin":
-            self.tkparam = TKParamWindow(title="Controller Liberators Calibration")  # tkparam window reference
-        else:
-            self.tkparam = None
+        self.profiler = None  # main loop stage profiler
+        self.tkparam = None  # tkparam window reference, None if tunable parameters are plain values
+        if tkparam and check_os() != "Darwin":
+            from tkparam import TKParamWindow
+            self.tkparam = TKParamWindow(title="Controller Liberators Calibration")
 
     @property
     def active_preset(self):
@@ -4,9 +4,28 @@ This module defines the virtual racing control types, needs to be implemented.
 """
 
 from abc import ABC, abstractmethod
+from typing import NamedTuple, Optional
+
+
+class ControlState(NamedTuple):
+    """
+    Full set of racing controls sent to a virtual controller in one update.
+    """
+    steer: float = 0.0  # steering value between -1.0 (left) and 1.0 (right)
+    throttle: float = 0.0  # throttle value between 0.0 and 1.0
+    brake: float = 0.0  # brake value between 0.0 and 1.0
 
 
 class VRacingController(ABC):
+    last_state: Optional[ControlState] = None
+    """State sent by the last apply() call"""
+
+    flushed_updates: int = 0
+    """Number of apply() calls that sent at least one changed field"""
+
+    suppressed_updates: int = 0
+    """Number of unchanged fields not sent again by apply()"""
+
     @abstractmethod
     def steer(self, value: float):
         """
@@ -28,6 +47,47 @@ class VRacingController(ABC):
         :param value: brake value between 0.0 and 1.0
         """
 
+    def apply(self, state: ControlState):
+        """
+        Send a full control state, only the fields changed since the last state are sent, then flushed once.
+        :param state: control state to send
+        """
+        last = self.last_state
+        changed = False
+        if last is None or state.steer != last.steer:
+            self._set_steer(state.steer)
+            changed = True
+        else:
+            self.suppressed_updates += 1
+        if last is None or state.throttle != last.throttle:
+            self._set_throttle(state.throttle)
+            changed = True
+        else:
+            self.suppressed_updates += 1
+        if last is None or state.brake != last.brake:
+            self._set_brake(state.brake)
+            changed = True
+        else:
+            self.suppressed_updates += 1
+
+        self.last_state = state
+        if changed:
+            self._flush()
+            self.flushed_updates += 1
+
+    def _set_steer(self, value: float):
+        """Set the steering of an apply() update, backends batching their output override the _set_* hooks."""
+        self.steer(value)
+
+    def _set_throttle(self, value: float):
+        self.throttle(value)
+
+    def _set_brake(self, value: float):
+        self.brake(value)
+
+    def _flush(self):
+        """Send the fields set during an apply() update at once."""
+
     def close(self):
         """
         Release the controller resources.
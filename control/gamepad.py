@@ -48,6 +48,22 @@ class VGamepadWin(VRacingController):
             self._gamepad.left_joystick_float(value, 0)  # [-1.0, 1.0]
             self._gamepad.update()
 
+    def _set_brake(self, value: float):
+        if self._gamepad:
+            self._gamepad.left_trigger_float(value)
+
+    def _set_throttle(self, value: float):
+        if self._gamepad:
+            self._gamepad.right_trigger_float(value)
+
+    def _set_steer(self, value: float):
+        if self._gamepad:
+            self._gamepad.left_joystick_float(value, 0)
+
+    def _flush(self):
+        if self._gamepad:
+            self._gamepad.update()  # one device report for the whole state
+
     def press_button(self, button):
         if self._gamepad:
             self._gamepad.press_button(button)
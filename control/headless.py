@@ -0,0 +1,85 @@
+"""
+Group: Controller Liberators
+Virtual controllers without any device, for headless runs on build and bench servers.
+NullController drops the controls, RecordingController writes every update to a CSV file for later inspection.
+"""
+
+from time import perf_counter
+import csv
+
+from control.controller import VRacingController, ControlState
+
+
+class NullController(VRacingController):
+    """
+    Controller discarding all controls, only counting the updates.
+    """
+
+    def __init__(self):
+        self.state = ControlState()
+
+    def steer(self, value: float):
+        self.state = self.state._replace(steer=value)
+
+    def throttle(self, value: float):
+        self.state = self.state._replace(throttle=value)
+
+    def brake(self, value: float):
+        self.state = self.state._replace(brake=value)
+
+    def stats(self) -> dict:
+        return {
+            "flushed_updates": self.flushed_updates,
+            "suppressed_updates": self.suppressed_updates,
+        }
+
+
+class RecordingController(NullController):
+    """
+    Controller writing the full control state of every update as a CSV row (t, steer, throttle, brake).
+    """
+
+    def __init__(self, path: str):
+        """
+        :param path: CSV file to write, overwritten if it exists
+        """
+        super().__init__()
+        self.path: str = path
+        self._file = open(path, "w", newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(["t", "steer", "throttle", "brake"])
+        self._start: float = perf_counter()
+        self.recorded_updates: int = 0
+
+    def steer(self, value: float):
+        super().steer(value)
+        self._flush()
+
+    def throttle(self, value: float):
+        super().throttle(value)
+        self._flush()
+
+    def brake(self, value: float):
+        super().brake(value)
+        self._flush()
+
+    def _set_steer(self, value: float):
+        NullController.steer(self, value)
+
+    def _set_throttle(self, value: float):
+        NullController.throttle(self, value)
+
+    def _set_brake(self, value: float):
+        NullController.brake(self, value)
+
+    def _flush(self):
+        s = self.state
+        self._writer.writerow([f"{perf_counter() - self._start:.6f}", f"{s.steer:.6f}", f"{s.throttle:.6f}",
+                               f"{s.brake:.6f}"])
+        self.recorded_updates += 1
+
+    def stats(self) -> dict:
+        return {**super().stats(), "recorded_updates": self.recorded_updates, "path": self.path}
+
+    def close(self):
+        self._file.close()
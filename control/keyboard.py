@@ -2,15 +2,147 @@
 Group: Controller Liberators
 This code provides a simpler way to send gamepad controls to the virtual controller.
 For Mac and Linux users.
+
+pynput press/release calls are a round trip to the X server on Linux, so in asynchronous mode the key events of
+every control update are handed to a worker thread through a bounded queue instead of being sent on the main loop.
+The worker drains everything queued since its last tick, reduces the events to the last one per key (dropping it
+if it leaves the key as it was), and measures the time from enqueueing to emitting each update. Once no update
+came in for a while (e.g. no pose detected), the worker releases every held key until the next update.
+
+Keys are only on or off, so in PWM mode the analog pressures are emulated by pulse-width modulation instead: a
+timer thread presses every key at the start of each carrier period and releases it after the fraction of the
+period given by its pressure. The timer sleeps until shortly before each edge and waits out the last few hundred
+microseconds in a loop that yields the GIL on every turn, so the edges stay on time without starving the main
+loop, and the lateness of every edge is measured. The timer and the worker share one lock around the keyboard.
 """
 
+from queue import Queue, Full, Empty
+from threading import Thread, Event, Lock
+from time import perf_counter, sleep
+from typing import Dict, List, Optional, Set, Tuple
+
 from control.controller import VRacingController
-from pynput.keyboard import Controller
+from profiler import LatencyHistogram
+
+PRESS = "press"
+RELEASE = "release"
+
+MAX_SPIN_US = 1000.0
+"""Upper bound of the PWM timer's spin before an edge"""
+
+
+class PwmKeyDriver:
+    """
+    Timer thread pressing keys with a duty cycle, the duty cycles may be changed from any thread.
+    """
+
+    def __init__(self, emit, keys, carrier_hz: float = 15.0, min_duty: float = 0.05, spin_us: float = 500.0):
+        """
+        :param emit: function sending a list of (action, key) events
+        :param keys: keys driven by the timer
+        :param carrier_hz: PWM periods per second, a pulse should last at least one frame of the game
+        :param min_duty: duty cycles below this are off, above 1 - min_duty the key is held down
+        :param spin_us: microseconds before an edge from which the timer stops sleeping and polls the clock,
+            at most MAX_SPIN_US
+        """
+        self.emit = emit
+        self.period: float = 1.0 / carrier_hz
+        self.min_duty: float = min_duty
+        self.spin: float = min(max(spin_us, 0.0), MAX_SPIN_US) / 1e6
+        self.duty: Dict[str, float] = {key: 0.0 for key in keys}  # assigned as a whole by set_duty
+        self._down: Dict[str, bool] = {key: False for key in keys}
+        self._stop = Event()
+        self._thread: Optional[Thread] = None
+
+        self.drift = LatencyHistogram(min_ms=0.001)  # lateness of every edge in milliseconds
+        self.periods: int = 0
+        self.overruns: int = 0  # periods skipped because the timer fell more than a period behind
+
+    def set_duty(self, **duty: float) -> None:
+        """Update the duty cycles in [0, 1] of the given keys, e.g. set_duty(w=0.4)."""
+        self.duty = {**self.duty, **duty}  # single reference swap, read by the timer thread
+
+    def start(self) -> "PwmKeyDriver":
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = Thread(target=self._timer_loop, name="KeyboardPWM", daemon=True)
+            self._thread.start()
+        return self
+
+    def _wait_until(self, t: float) -> None:
+        delay = t - perf_counter() - self.spin
+        if delay > 0:
+            sleep(delay)
+        while perf_counter() < t:
+            sleep(0)  # yields the GIL to the main loop on every turn
+
+    def _set_keys(self, keys, down: bool) -> None:
+        events = [(PRESS if down else RELEASE, key) for key in keys if self._down[key] != down]
+        if events:
+            self.emit(events)
+            for key in keys:
+                self._down[key] = down
+
+    def _timer_loop(self) -> None:
+        start = perf_counter()
+        while not self._stop.is_set():
+            duty = self.duty
+            # Keys above the minimum duty are pressed at the period start and released at their own edge
+            on = [key for key, d in duty.items() if d > self.min_duty]
+            self._set_keys([key for key, d in duty.items() if d <= self.min_duty], False)
+            self._set_keys(on, True)
+            self.drift.record(max(perf_counter() - start, 0.0) * 1000.0)
+            edges = sorted((start + d * self.period, key) for key, d in duty.items()
+                           if self.min_duty < d < 1.0 - self.min_duty)
+            for t, key in edges:
+                self._wait_until(t)
+                if self._stop.is_set():
+                    break
+                self._set_keys([key], False)
+                self.drift.record((perf_counter() - t) * 1000.0)
+            self.periods += 1
+
+            start += self.period
+            if perf_counter() - start > self.period:
+                self.overruns += 1
+                start = perf_counter()  # do not burst to catch up
+            self._wait_until(start)
+        self._set_keys(list(self._down), False)
+
+    def stats(self) -> dict:
+        """Return timer counters, drift in milliseconds."""
+        return {
+            "periods": self.periods,
+            "overruns": self.overruns,
+            "drift_p50": round(self.drift.percentile(50), 4),
+            "drift_p99": round(self.drift.percentile(99), 4),
+            "drift_max": round(self.drift.max_ms, 4),
+        }
+
+    def stop(self) -> None:
+        """Stop the timer, all keys are released."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
 
 
 class KeyboardController(VRacingController):
-    def __init__(self):
-        self.keyboard = Controller()
+    def __init__(self, keyboard=None, asynchronous: bool = False, queue_size: int = 32, pwm_hz: float = 0.0,
+                 pwm_min_duty: float = 0.05, pwm_spin_us: float = 500.0, idle_release_ms: float = 500.0):
+        """
+        :param keyboard: pynput keyboard Controller to send keys with, a new one is created by default
+        :param asynchronous: send the key events from a worker thread instead of the calling thread
+        :param queue_size: maximum control updates waiting for the worker
+        :param idle_release_ms: asynchronous mode, release every key when no update came in for this long, 0 never
+        :param pwm_hz: carrier frequency emulating analog pressures by pulse-width modulation, 0 for on/off keys
+        :param pwm_min_duty: see PwmKeyDriver
+        :param pwm_spin_us: see PwmKeyDriver
+        """
+        if keyboard is None:
+            from pynput.keyboard import Controller  # only needed for a real keyboard, not for injected ones
+            keyboard = Controller()
+        self.keyboard = keyboard
         self.steering_keys = {
             "left": "a",
             "right": "d",
@@ -23,55 +155,229 @@ class KeyboardController(VRacingController):
         self.is_brake = False
         self.trigger_thresh = 0.0001
 
+        self._emit_lock = Lock()  # the PWM timer and the worker both send key events
+        self._held: Set[str] = set()  # keys pressed by the emitted events
+        self._pending: List[Tuple[str, str]] = []  # (action, key) events of the current update
+        self._backlog: List[Tuple[str, str]] = []  # events of updates that did not fit into the full queue
+        self._backlog_time: float = 0.0  # enqueue time of the oldest backlog event
+        self._backlog_lock = Lock()  # guards the backlog and keeps it behind the queued updates
+        self._queue: Optional[Queue] = None
+        self._worker: Optional[Thread] = None
+        self.idle_release: float = idle_release_ms / 1000.0
+        self._last_update: float = perf_counter()
+        self._idle_released: bool = False  # the worker released the keys, the next update sends every field again
+        self.latency = LatencyHistogram()  # enqueue-to-emit latency of the asynchronous updates
+        self.emitted_events: int = 0
+        self.coalesced_events: int = 0
+        self.queue_full_count: int = 0
+        self.idle_releases: int = 0
+        if asynchronous:
+            self._queue = Queue(maxsize=queue_size)
+            self._worker = Thread(target=self._emit_loop, name="KeyboardOutput", daemon=True)
+            self._worker.start()
+        self.pwm: Optional[PwmKeyDriver] = None
+        if pwm_hz > 0:
+            # The timer thread sends its edges itself, queueing them would add the worker's latency as jitter
+            self.pwm = PwmKeyDriver(self._emit, self.steering_keys.values(), pwm_hz, pwm_min_duty, pwm_spin_us).start()
+
+    def apply(self, state):
+        self._last_update = perf_counter()
+        if self._idle_released:
+            # The keys were released behind the back of the key states, send every field again
+            self._idle_released = False
+            self.is_steer_left = self.is_steer_right = self.is_throttle = self.is_brake = False
+            self.last_state = None
+        super().apply(state)
+
     def steer(self, value: float):
+        self._set_steer(value)
+        self._flush()
+
+    def throttle(self, value: float):
+        self._set_throttle(value)
+        self._flush()
+
+    def brake(self, value: float):
+        self._set_brake(value)
+        self._flush()
+
+    def _set_steer(self, value: float):
+        if self.pwm:
+            self.pwm.set_duty(**{self.steering_keys["left"]: max(-value, 0.0),
+                                 self.steering_keys["right"]: max(value, 0.0)})
+            return
         if abs(value) < self.trigger_thresh:
             # print("release steering")
             if self.is_steer_left:
-                self.keyboard.release(self.steering_keys["left"])
+                self._pending.append((RELEASE, self.steering_keys["left"]))
                 self.is_steer_left = False
             if self.is_steer_right:
-                self.keyboard.release(self.steering_keys["right"])
+                self._pending.append((RELEASE, self.steering_keys["right"]))
                 self.is_steer_right = False
         elif value < 0:
             if not self.is_steer_left:
-                self.keyboard.press(self.steering_keys["left"])
+                self._pending.append((PRESS, self.steering_keys["left"]))
                 self.is_steer_left = True
         elif value > 0:
             if not self.is_steer_right:
-                self.keyboard.press(self.steering_keys["right"])
+                self._pending.append((PRESS, self.steering_keys["right"]))
                 self.is_steer_right = True
 
-    def throttle(self, value: float):
+    def _set_throttle(self, value: float):
+        if self.pwm:
+            self.pwm.set_duty(**{self.steering_keys["throttle"]: value})
+            return
         if abs(value) < self.trigger_thresh:
             if self.is_throttle:
-                self.keyboard.release(self.steering_keys["throttle"])
+                self._pending.append((RELEASE, self.steering_keys["throttle"]))
                 self.is_throttle = False
         elif value > 0:
             if not self.is_throttle:
-                self.keyboard.press(self.steering_keys["throttle"])
+                self._pending.append((PRESS, self.steering_keys["throttle"]))
                 self.is_throttle = True
 
-    def brake(self, value: float):
+    def _set_brake(self, value: float):
+        if self.pwm:
+            self.pwm.set_duty(**{self.steering_keys["brake"]: value})
+            return
         if abs(value) < self.trigger_thresh:
             if self.is_brake:
-                self.keyboard.release(self.steering_keys["brake"])
+                self._pending.append((RELEASE, self.steering_keys["brake"]))
                 self.is_brake = False
         elif value > 0:
             if not self.is_brake:
-                self.keyboard.press(self.steering_keys["brake"])
+                self._pending.append((PRESS, self.steering_keys["brake"]))
                 self.is_brake = True
 
+    def _flush(self):
+        """Send the key events of the current update, or hand them to the worker in asynchronous mode."""
+        if not self._pending and not self._backlog:
+            return
+        events, self._pending = self._pending, []
+        if self._queue is None:
+            self._emit(events)
+            return
+        with self._backlog_lock:
+            if self._backlog:
+                self._backlog.extend(events)  # stay behind the events already waiting
+                return
+            try:
+                self._queue.put_nowait((perf_counter(), events))
+            except Full:
+                # Never block the main loop, the worker picks the events up in order once it drained the queue
+                self._backlog = events
+                self._backlog_time = perf_counter()
+                self.queue_full_count += 1
+
+    def _emit(self, events: List[Tuple[str, str]]):
+        with self._emit_lock:
+            for action, key in events:
+                if action == PRESS:
+                    self.keyboard.press(key)
+                else:
+                    self.keyboard.release(key)
+            self.emitted_events += len(events)
+            for action, key in events:
+                if action == PRESS:
+                    self._held.add(key)
+                else:
+                    self._held.discard(key)
+
+    def _coalesce(self, events: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+        """
+        Reduce the events to the last one per key, in the order of those last events, and drop it if the key is
+        already in that state, e.g. a press and a later release of a key that was up cancel out.
+        """
+        last: Dict[str, str] = {}
+        for action, key in events:
+            last.pop(key, None)
+            last[key] = action
+        result = [(action, key) for key, action in last.items() if (action == PRESS) != (key in self._held)]
+        self.coalesced_events += len(events) - len(result)
+        return result
+
+    def _release_idle(self) -> None:
+        """Release every key when no update came in for idle_release seconds, e.g. while no pose is detected."""
+        if perf_counter() - self._last_update < self.idle_release or self._idle_released:
+            return
+        if self.pwm and any(duty > 0 for duty in self.pwm.duty.values()):
+            self.pwm.set_duty(**{key: 0.0 for key in self.pwm.duty})  # the timer releases them
+        elif self._held:
+            self._emit([(RELEASE, key) for key in sorted(self._held)])
+        else:
+            return
+        self._idle_released = True
+        self.idle_releases += 1
+
+    def _emit_loop(self):
+        timeout = self.idle_release / 2 if self.idle_release > 0 else None
+        while True:
+            try:
+                batches = [self._queue.get(timeout=timeout)]
+            except Empty:
+                self._release_idle()
+                continue
+            with self._backlog_lock:
+                try:
+                    while True:
+                        batches.append(self._queue.get_nowait())
+                except Empty:
+                    pass
+                if self._backlog:
+                    batches.append((self._backlog_time, self._backlog))
+                    self._backlog = []
+            stop = None in batches
+            batches = [b for b in batches if b is not None]
+
+            events = []
+            for _, batch_events in batches:
+                events.extend(batch_events)
+            self._emit(self._coalesce(events))
+            now = perf_counter()
+            for enqueued, _ in batches:
+                self.latency.record((now - enqueued) * 1000.0)
+            if stop:
+                return
+
+    def stats(self) -> dict:
+        """Return key event counters, latencies in milliseconds."""
+        pwm_stats = {f"pwm_{k}": v for k, v in self.pwm.stats().items()} if self.pwm else {}
+        return {
+            "emitted": self.emitted_events,
+            "coalesced": self.coalesced_events,
+            "queue_full": self.queue_full_count,
+            "idle_releases": self.idle_releases,
+            "latency_p50": round(self.latency.percentile(50), 3),
+            "latency_p99": round(self.latency.percentile(99), 3),
+            "latency_max": round(self.latency.max_ms, 3),
+            **pwm_stats,
+        }
+
     def close(self):
+        if self.pwm:
+            self.pwm.stop()  # releases the keys it holds
         if self.is_steer_left:
-            self.keyboard.release(self.steering_keys["left"])
+            self._pending.append((RELEASE, self.steering_keys["left"]))
             self.is_steer_left = False
         if self.is_steer_right:
-            self.keyboard.release(self.steering_keys["right"])
+            self._pending.append((RELEASE, self.steering_keys["right"]))
             self.is_steer_right = False
         if self.is_throttle:
-            self.keyboard.release(self.steering_keys["throttle"])
+            self._pending.append((RELEASE, self.steering_keys["throttle"]))
             self.is_throttle = False
         if self.is_brake:
-            self.keyboard.release(self.steering_keys["brake"])
+            self._pending.append((RELEASE, self.steering_keys["brake"]))
             self.is_brake = False
+        if self._worker is not None:
+            with self._backlog_lock:
+                events = self._backlog + self._pending
+                self._backlog, self._pending = [], []
+            self._queue.put((perf_counter(), events))  # blocking is fine on exit
+            self._queue.put(None)
+            self._worker.join()
+            self._worker = None
+        else:
+            self._flush()
+        if self._held:
+            self._emit([(RELEASE, key) for key in sorted(self._held)])  # e.g. pressed again by the PWM timer
         del self.keyboard
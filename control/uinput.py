@@ -0,0 +1,156 @@
+"""
+Group: Controller Liberators
+This code provides an analog virtual gamepad on Linux through the kernel's uinput module.
+For Linux users.
+
+Unlike the keyboard controller, steering, throttle and brake are real analog axes. The axis events of one update
+are packed into a single buffer ending with one SYN_REPORT and handed to the kernel with a single write.
+The device is created with python-evdev (pip install evdev) and needs write access to /dev/uinput; any object with
+a write(bytes) method may be passed instead, e.g. io.BytesIO to test without the device.
+"""
+
+from typing import List, Tuple
+import os
+import struct
+import time
+
+from control.controller import VRacingController
+
+# Event types and codes from linux/input-event-codes.h
+EV_SYN = 0x00
+EV_KEY = 0x01
+EV_ABS = 0x03
+SYN_REPORT = 0
+ABS_X = 0x00  # left stick horizontal axis: steering
+ABS_Y = 0x01
+ABS_Z = 0x02  # left trigger: brake
+ABS_RZ = 0x05  # right trigger: throttle
+BTN_A = 0x130
+BTN_B = 0x131
+BTN_X = 0x133
+BTN_Y = 0x134
+BTN_SELECT = 0x13a
+BTN_START = 0x13b
+
+STICK_MAX = 32767
+TRIGGER_MAX = 1023
+
+INPUT_EVENT = struct.Struct("llHHi")
+"""struct input_event: timeval (seconds, microseconds), type, code, value"""
+
+
+def pack_events(events: List[Tuple[int, int, int]]) -> bytes:
+    """
+    Pack (type, code, value) events into struct input_event records with the current time.
+    """
+    t = time.time()
+    sec, usec = int(t), int((t % 1.0) * 1e6)
+    return b"".join(INPUT_EVENT.pack(sec, usec, etype, code, value) for etype, code, value in events)
+
+
+def unpack_events(data: bytes) -> List[Tuple[int, int, int]]:
+    """
+    Unpack struct input_event records into (type, code, value) events, the inverse of pack_events.
+    """
+    return [(etype, code, value) for _, _, etype, code, value in INPUT_EVENT.iter_unpack(data)]
+
+
+class _UInputWriter:
+    """
+    Writes packed events to a python-evdev UInput device.
+    """
+
+    def __init__(self, name: str):
+        from evdev import UInput, AbsInfo, ecodes
+
+        capabilities = {
+            ecodes.EV_KEY: [BTN_A, BTN_B, BTN_X, BTN_Y, BTN_SELECT, BTN_START],
+            ecodes.EV_ABS: [
+                (ABS_X, AbsInfo(value=0, min=-STICK_MAX, max=STICK_MAX, fuzz=0, flat=0, resolution=0)),
+                (ABS_Y, AbsInfo(value=0, min=-STICK_MAX, max=STICK_MAX, fuzz=0, flat=0, resolution=0)),
+                (ABS_Z, AbsInfo(value=0, min=0, max=TRIGGER_MAX, fuzz=0, flat=0, resolution=0)),
+                (ABS_RZ, AbsInfo(value=0, min=0, max=TRIGGER_MAX, fuzz=0, flat=0, resolution=0)),
+            ],
+        }
+        self.device = UInput(capabilities, name=name)
+
+    def write(self, data: bytes) -> None:
+        os.write(self.device.fd, data)
+
+    def close(self) -> None:
+        self.device.close()
+
+
+class UInputGamepad(VRacingController):
+    """
+    Analog virtual gamepad created through uinput.
+    """
+
+    def __init__(self, writer=None, name: str = "Controller Liberator Gamepad"):
+        """
+        :param writer: object with write(bytes) receiving the packed events, a uinput device is created by default
+        :param name: device name shown to games
+        """
+        self.writer = writer if writer is not None else _UInputWriter(name)
+        self._pending: List[Tuple[int, int, int]] = []  # axis events of the current update
+        self.writes: int = 0  # write calls, one per update
+        self.events: int = 0  # axis events written
+
+    @staticmethod
+    def _axis(value: float, lo: float, hi: float, scale: int) -> int:
+        return int(round(min(max(value, lo), hi) * scale))
+
+    def brake(self, value: float):
+        self._set_brake(value)
+        self._flush()
+
+    def throttle(self, value: float):
+        self._set_throttle(value)
+        self._flush()
+
+    def steer(self, value: float):
+        self._set_steer(value)
+        self._flush()
+
+    def _set_brake(self, value: float):
+        self._pending.append((EV_ABS, ABS_Z, self._axis(value, 0.0, 1.0, TRIGGER_MAX)))
+
+    def _set_throttle(self, value: float):
+        self._pending.append((EV_ABS, ABS_RZ, self._axis(value, 0.0, 1.0, TRIGGER_MAX)))
+
+    def _set_steer(self, value: float):
+        self._pending.append((EV_ABS, ABS_X, self._axis(value, -1.0, 1.0, STICK_MAX)))
+
+    def _flush(self):
+        if not self._pending:
+            return
+        events, self._pending = self._pending, []
+        self.writer.write(pack_events(events + [(EV_SYN, SYN_REPORT, 0)]))  # one report for the whole update
+        self.writes += 1
+        self.events += len(events)
+
+    def stats(self) -> dict:
+        """Return write counters."""
+        return {
+            "writes": self.writes,
+            "events": self.events,
+        }
+
+    def close(self):
+        self._set_steer(0.0)
+        self._set_throttle(0.0)
+        self._set_brake(0.0)
+        self._flush()
+        if isinstance(self.writer, _UInputWriter):
+            self.writer.close()  # injected writers belong to the caller
+
+
+def uinput_available() -> bool:
+    """Whether a uinput device can be created on this machine: python-evdev is installed and /dev/uinput writable."""
+    if not os.access("/dev/uinput", os.W_OK):
+        return False
+    try:
+        import evdev  # noqa: F401
+    except ImportError:
+        return False
+    return True
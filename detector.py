@@ -10,6 +10,13 @@ Features:
 - Cross-platform support (macOS, Windows, Linux)
 - Configurable via sysconfig.ini
 - Preset-aware visualization settings
+- Optional process-backed inference (see pose_worker.PoseProcess)
+- Optional ROI tracking, running inference on a crop around the previous pose (see roi.RoiTracker)
+- Optional adaptive model complexity driven by the measured inference time (see complexity.AdaptiveComplexity)
+- Optional frame skipping with landmark motion prediction in between (see prediction.LandmarkPredictor)
+- Optional non-blocking MediaPipe Tasks backend (see pose_landmarker.AsyncPoseLandmarker)
+- Multi-player detection, one lane process per player (see lanes.LanePoseDetector) or several poses of the tasks
+  backend assigned to players by tracking (see players.PlayerTracker)
 
 Usage:
     from detector import Detector
@@ -18,6 +25,7 @@ Usage:
     ctx = Context(config)
     detector = Detector(ctx)
     landmarks, visual_frame = detector.get_landmarks(rgb_frame)
+    poses, visual_frame = Detector(ctx, players=2).get_poses(rgb_frame)  # multi-player
 """
 import numpy as np
 
@@ -34,16 +42,29 @@ try:
 except Exception:
     cv2 = None
     _HAS_CV2 = False
+from time import perf_counter
 from context import Context
+from landmarks import LANDMARK_SHAPE, LandmarkArray, landmarks_to_array
 
 
 class Detector:
     """
     Detect user pose, obtaining landmarks
     """
-    def __init__(self, ctx: Context):
+
+    MAX_PROCESS_RESTARTS = 3
+    """Pose process restarts within PROCESS_RESTART_WINDOW after which a dying child is taken as fatal"""
+
+    PROCESS_RESTART_WINDOW = 600.0
+    """Seconds without a restart after which earlier restarts no longer count towards MAX_PROCESS_RESTARTS"""
+
+    def __init__(self, ctx: Context, players: int = 1):
+        """
+        :param players: number of drivers to detect, more than one enables get_poses
+        """
         self.ctx: Context = ctx
         ctx.detector = self
+        self.players: int = max(1, players)
         # If mediapipe or cv2 aren't available, keep the detector in a
         # disabled state and provide clear runtime guidance when used.
         if not _HAS_MEDIAPIPE or not _HAS_CV2:
@@ -65,16 +86,88 @@ class Detector:
         
         # Load config from context
         cfg = ctx.cfg["MediaPipe"]
-        self.pose = self.mp_pose.Pose(
+        self.pose_kwargs = dict(
             static_image_mode=False,  # False for video stream，True for static image
             model_complexity=cfg.getint("model_complexity"),
-            smooth_landmarks=cfg.getboolean("smooth_landmarks"),
+            smooth_landmarks=cfg.getboolean("smooth_landmarks") and not self.__one_euro_replaces_smoothing(ctx),
             enable_segmentation=False,
             smooth_segmentation=True,
             min_detection_confidence=cfg.getfloat("min_detection_confidence"),
             min_tracking_confidence=cfg.getfloat("min_tracking_confidence")
         )
 
+        # In process mode the inference runs in a child process started on the first frame,
+        # when the frame shape is known
+        self.process_mode: bool = cfg.getboolean("process_mode", fallback=False)
+        self.process_slots: int = cfg.getint("process_slots", fallback=2)
+        self.pose_process = None
+        self.process_restarts: int = 0  # pose processes restarted after their child died
+        self._recent_restarts: int = 0  # restarts since the last PROCESS_RESTART_WINDOW without one
+        self._last_restart_time: float = 0.0
+
+        # The tasks backend runs the PoseLandmarker asynchronously in LIVE_STREAM mode instead of the solutions API
+        self.landmarker = None
+        if cfg.get("backend", fallback="solutions") == "tasks":
+            from pose_landmarker import AsyncPoseLandmarker
+            self.landmarker = AsyncPoseLandmarker(
+                cfg.get("task_model_path", fallback="Models/pose_landmarker_full.task"),
+                self.pose_kwargs["min_detection_confidence"],
+                cfg.getfloat("min_presence_confidence", fallback=self.pose_kwargs["min_detection_confidence"]),
+                self.pose_kwargs["min_tracking_confidence"], num_poses=self.players)
+            self.process_mode = False
+
+        # Multi-player: the tasks backend detects every pose at once, which the tracker assigns to the players,
+        # the solutions backend detects one pose per lane of the frame, each lane in its own process
+        self.tracker = None
+        self.lanes = None
+        if self.players > 1:
+            if self.landmarker is not None:
+                from players import PlayerTracker
+                self.tracker = PlayerTracker(
+                    self.players, ctx.cfg.getfloat("MultiPlayer", "track_max_distance", fallback=0.25),
+                    ctx.cfg.getint("MultiPlayer", "track_hold_frames", fallback=30))
+            else:
+                from lanes import LanePoseDetector
+                self.lanes = LanePoseDetector(self.pose_kwargs, self.players, self.process_slots)
+            self.process_mode = False
+        in_process = not self.process_mode and self.landmarker is None and self.lanes is None
+        self.pose = self.mp_pose.Pose(**self.pose_kwargs) if in_process else None
+
+        # ROI tracking crops the frame around the previous pose before inference (in-process mode only)
+        self.roi = None
+        if cfg.getboolean("roi_tracking", fallback=False) and in_process:
+            from roi import RoiTracker
+            self.roi = RoiTracker(cfg.getfloat("roi_margin", fallback=0.3), cfg.getint("roi_size", fallback=320),
+                                  cfg.getfloat("roi_min_visibility", fallback=0.5))
+
+        # Adaptive complexity swaps the Pose instance at runtime to keep inference within the budget
+        self.complexity_ctrl = None
+        if cfg.getboolean("adaptive_complexity", fallback=False) and in_process:
+            from complexity import AdaptiveComplexity
+            self.complexity_ctrl = AdaptiveComplexity(
+                lambda c: self.mp_pose.Pose(**{**self.pose_kwargs, "model_complexity": c}),
+                self.pose_kwargs["model_complexity"], cfg.getfloat("target_inference_ms", fallback=25.0),
+                cooldown=cfg.getint("adaptive_cooldown_frames", fallback=90),
+                measurement_ttl=cfg.getint("adaptive_measurement_ttl_frames", fallback=900))
+            self._visibility_buf = np.empty(LANDMARK_SHAPE, dtype=np.float32)
+
+        # Frame skipping runs inference only every Nth frame or once the minimum interval has passed,
+        # landmarks of the frames in between are extrapolated by the predictor
+        self.infer_every_n: int = max(1, cfg.getint("infer_every_n", fallback=1))
+        self.infer_interval: float = cfg.getfloat("infer_interval_ms", fallback=0.0) / 1000.0
+        self.predictor = None
+        if self.infer_every_n > 1 or self.infer_interval > 0:
+            from prediction import LandmarkPredictor
+            self.predictor = LandmarkPredictor(cfg.get("prediction_model", fallback="velocity"))
+        self._frames_since_inference: int = 0
+        self._last_inference_time: float = 0.0
+
+    @staticmethod
+    def __one_euro_replaces_smoothing(ctx: Context) -> bool:
+        """Whether the One Euro filter stage takes over MediaPipe's landmark smoothing."""
+        return (ctx.cfg.getboolean("Filter", "one_euro", fallback=False)
+                and ctx.cfg.getboolean("Filter", "replace_mediapipe_smoothing", fallback=False))
+
     def get_landmarks(self, frame):
         """
         Use the detector instance to detect user pose of upper body, obtain and return landmarks.
@@ -84,42 +177,200 @@ class Detector:
                 - landmarks: landmarks detected by MediaPipe, or None if no pose detected
                 - visual_frame: visualized frame with detected landmarks (if enabled)
         """
-        if getattr(self, 'disabled', False):
-            raise RuntimeError(
-                f"Detector cannot run because required packages are missing: {', '.join(self._missing_deps)}. "
-                "Install them in a Python 3.12 virtualenv (MediaPipe may not support 3.13 yet): "
-                "https://google.github.io/mediapipe/getting_started/python.html"
-            )
+        self.__check_available()
 
-        frame.flags.writeable = False
-        results = self.pose.process(frame)
-        frame.flags.writeable = True
+        if self.complexity_ctrl is not None:
+            new_pose = self.complexity_ctrl.poll()
+            if new_pose is not None:
+                old_pose, self.pose = self.pose, new_pose
+                old_pose.close()
+
+        now = perf_counter()
+        if self.predictor is not None and not self.__inference_due(now):
+            landmarks = self.predictor.predict(now)
+            self._frames_since_inference += 1
+        else:
+            if self.landmarker is not None:
+                self.landmarker.submit(frame)
+                landmarks = self.landmarker.poll()
+            elif self.process_mode:
+                landmarks = self.__process_in_child(frame)
+            elif self.roi is not None:
+                landmarks = self.__process_roi(frame)
+            else:
+                landmarks = self.__process(frame)
+            if self.predictor is not None:
+                landmarks = self.predictor.measure(landmarks, now)
+                self._frames_since_inference = 1
+                self._last_inference_time = now
 
         calibration_mode = self.ctx.gui.calibration_mode
         show_cam_capture = self.ctx.gui.show_cam_capture
         show_pose_estimation = self.ctx.gui.show_pose_estimation
 
-        if results.pose_landmarks:
+        if landmarks:
             if not calibration_mode:
-                return results.pose_landmarks, frame
+                return landmarks, frame
 
             if not show_cam_capture:
                 frame[:] = 0  # Set black background
             if show_pose_estimation:
                 mp_drawing = mp.solutions.drawing_utils
-                mp_drawing.draw_landmarks(frame, results.pose_landmarks, self.mp_pose.POSE_CONNECTIONS)
-            return results.pose_landmarks, frame
+                proto = landmarks.to_proto() if isinstance(landmarks, LandmarkArray) else landmarks
+                mp_drawing.draw_landmarks(frame, proto, self.mp_pose.POSE_CONNECTIONS)
+            return landmarks, frame
         else:
             if not show_cam_capture:
                 frame[:] = 0
             return None, frame
-    
+
+    def get_poses(self, frame):
+        """
+        Detect the pose of every player, in single-player mode the landmarks of get_landmarks.
+        :param frame: frame in RGB format
+        Returns:
+            tuple: (poses, visual_frame)
+                - poses: landmarks per player, None for the players not detected
+                - visual_frame: visualized frame with detected landmarks (if enabled)
+        """
+        if self.players == 1:
+            landmarks, frame = self.get_landmarks(frame)
+            return [landmarks], frame
+        self.__check_available()
+
+        if self.lanes is not None:
+            poses = self.lanes.process(frame)
+        else:
+            self.landmarker.submit(frame)
+            poses = self.tracker.update(self.landmarker.poll_poses(), frame.shape)
+
+        found = [landmarks for landmarks in poses if landmarks is not None]
+        if found and not self.ctx.gui.calibration_mode:
+            return poses, frame
+        if not self.ctx.gui.show_cam_capture:
+            frame[:] = 0  # Set black background
+        if self.ctx.gui.show_pose_estimation:
+            mp_drawing = mp.solutions.drawing_utils
+            for landmarks in found:
+                mp_drawing.draw_landmarks(frame, landmarks.to_proto(), self.mp_pose.POSE_CONNECTIONS)
+        return poses, frame
+
+    def __check_available(self) -> None:
+        if getattr(self, 'disabled', False):
+            raise RuntimeError(
+                f"Detector cannot run because required packages are missing: {', '.join(self._missing_deps)}. "
+                "Install them in a Python 3.12 virtualenv (MediaPipe may not support 3.13 yet): "
+                "https://google.github.io/mediapipe/getting_started/python.html"
+            )
+
+    def __inference_due(self, now: float) -> bool:
+        """
+        Whether the current frame should run full inference rather than being predicted.
+        """
+        if not self.predictor.tracking:
+            return True
+        if self.infer_interval > 0:
+            return now - self._last_inference_time >= self.infer_interval
+        return self._frames_since_inference >= self.infer_every_n
+
+    def __process(self, image):
+        """
+        Run MediaPipe pose inference on the image and return the detected landmarks or None.
+        """
+        image.flags.writeable = False
+        t = perf_counter()
+        results = self.pose.process(image)
+        elapsed = perf_counter() - t
+        if self.ctx.profiler:
+            self.ctx.profiler.record("pose_process", elapsed)
+        image.flags.writeable = True
+
+        if self.complexity_ctrl is not None:
+            landmarks = results.pose_landmarks
+            confidence = 0.0
+            if landmarks is not None:
+                confidence = float(landmarks_to_array(landmarks, out=self._visibility_buf)[:, 3].mean())
+            self.complexity_ctrl.record(elapsed * 1000.0, confidence)
+        return results.pose_landmarks
+
+    def __process_roi(self, frame):
+        """
+        Run inference on the crop around the previous pose, falling back to the full frame when tracking is lost.
+        Landmarks are returned in full-frame normalized coordinates.
+        """
+        roi = self.roi
+        cropped = roi.tracking
+        landmarks = self.__process(roi.crop(frame))
+        if landmarks is None and cropped:  # lost inside the crop, retry on the full frame right away
+            roi.update(None, frame.shape)
+            landmarks = self.__process(roi.crop(frame))
+        if landmarks is not None:
+            landmarks = roi.to_full_frame(landmarks, frame.shape)
+        roi.update(landmarks, frame.shape)
+        return landmarks
+
+    def __process_in_child(self, frame):
+        """
+        Hand the frame over to the pose process and return the latest available landmarks.
+        Inference is pipelined, so the landmarks may belong to a frame submitted slightly earlier.
+        """
+        from pose_worker import PoseProcess, PoseProcessError
+
+        proc = self.pose_process
+        if proc is not None and proc.frame_shape != frame.shape:
+            proc.close()  # capture resolution changed, restart with new slots
+            proc = None
+        if proc is None:
+            proc = self.pose_process = PoseProcess(self.pose_kwargs, frame.shape, self.process_slots)
+
+        try:
+            proc.poll()
+            proc.submit(frame)
+            if proc.latest is None and proc.completed_frames == 0:
+                proc.poll(timeout=5.0)  # wait for the child to warm up on the very first frame
+        except PoseProcessError as e:
+            # No landmarks for this frame, a new child is started with the next one
+            now = perf_counter()
+            if now - self._last_restart_time > self.PROCESS_RESTART_WINDOW:
+                self._recent_restarts = 0  # the child ran fine for a while, an isolated crash is not fatal
+            self._last_restart_time = now
+            self.process_restarts += 1
+            self._recent_restarts += 1
+            if self._recent_restarts > self.MAX_PROCESS_RESTARTS:
+                raise
+            print(f"{e}, restarting it")
+            proc.close()
+            self.pose_process = None
+            return None
+        return proc.latest
+
     def close(self):
         """
         Release MediaPipe resources
         """
+        if getattr(self, 'complexity_ctrl', None):
+            self.complexity_ctrl.close()
         if hasattr(self, 'pose') and self.pose:
             self.pose.close()
+        if getattr(self, 'roi', None):
+            print(f"ROI tracking stats: {self.roi.stats()}")
+        if getattr(self, 'predictor', None):
+            print(f"Prediction stats: {self.predictor.stats()}")
+        if getattr(self, 'landmarker', None):
+            print(f"Pose landmarker stats: {self.landmarker.stats()}")
+            self.landmarker.close()
+            self.landmarker = None
+        if getattr(self, 'tracker', None):
+            print(f"Player tracking stats: {self.tracker.stats()}")
+        if getattr(self, 'lanes', None):
+            print(f"Lane process stats: {self.lanes.stats()}")
+            self.lanes.close()
+            self.lanes = None
+        if getattr(self, 'pose_process', None):
+            stats = {**self.pose_process.stats(), "restarts": self.process_restarts}
+            print(f"Pose process stats: {stats}")
+            self.pose_process.close()
+            self.pose_process = None
 
 
 
@@ -0,0 +1,129 @@
+"""
+Group: Controller Liberators
+Low-lag One Euro filtering of the hand landmarks, applied between the detector and the mapper.
+
+The One Euro filter is a first-order low-pass filter whose cutoff frequency rises with the speed of the signal:
+slow movements are smoothed strongly (less steering jitter near the safe angle) while fast movements pass with
+little delay. Unlike MediaPipe's fixed smoother, its min cutoff and beta are tunable, and stored per preset.
+Reference: Casiez, Roussel and Vogel, "1 Euro Filter", CHI 2012.
+"""
+
+from typing import Optional
+import math
+import numpy as np
+
+from context import Context
+from landmarks import LandmarkArray
+from presets import Preset
+from utils import param_value
+
+
+class OneEuroFilter:
+    """
+    One Euro filter vectorized over an array of signals filtered independently.
+    """
+
+    def __init__(self, min_cutoff: float = 1.5, beta: float = 8.0, d_cutoff: float = 1.0):
+        """
+        :param min_cutoff: cutoff frequency in Hz at zero speed, lower means smoother but laggier when still
+        :param beta: speed coefficient, higher means less lag during fast movements
+        :param d_cutoff: cutoff frequency in Hz of the derivative estimate
+        """
+        self.min_cutoff: float = min_cutoff
+        self.beta: float = beta
+        self.d_cutoff: float = d_cutoff
+        self._x: Optional[np.ndarray] = None  # last filtered value
+        self._dx: Optional[np.ndarray] = None  # last filtered derivative
+        self._t: float = 0.0
+
+    @staticmethod
+    def _alpha(cutoff, dt: float):
+        tau = 1.0 / (2.0 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def reset(self) -> None:
+        self._x = None
+        self._dx = None
+
+    def __call__(self, x: np.ndarray, t: float) -> np.ndarray:
+        """
+        Filter the signal values x sampled at time t (seconds), return the filtered values.
+        """
+        if self._x is None:
+            self._x = np.array(x, dtype=np.float64)
+            self._dx = np.zeros_like(self._x)
+            self._t = t
+            return self._x
+
+        dt = t - self._t
+        if dt <= 0.0:
+            return self._x
+        self._t = t
+
+        dx = (x - self._x) / dt
+        self._dx += self._alpha(self.d_cutoff, dt) * (dx - self._dx)
+        cutoff = self.min_cutoff + self.beta * np.abs(self._dx)
+        self._x += self._alpha(cutoff, dt) * (x - self._x)
+        return self._x
+
+
+class LandmarkFilter:
+    """
+    Filtering stage running the One Euro filter on the hand landmark coordinates, parameters come from the preset.
+    """
+
+    def __init__(self, ctx: Context, indices, enabled: bool = True):
+        """
+        :param indices: indices of the landmarks to filter, e.g. PoseControlMapper.hand_indices
+        :param enabled: pass the landmarks through unchanged if False
+        """
+        self.ctx: Context = ctx
+        ctx.landmark_filter = self
+        self.enabled: bool = enabled
+        self.indices = np.asarray(indices)
+        self.filter = OneEuroFilter()
+
+        # Sliders only when the filter runs, a disabled filter keeps the calibration window free of dead controls
+        self._tunable: bool = enabled and ctx.tkparam is not None
+        if not self._tunable:
+            self.min_cutoff: float = self.filter.min_cutoff
+            self.beta: float = self.filter.beta
+            self.d_cutoff: float = self.filter.d_cutoff
+        else:
+            self.min_cutoff = ctx.tkparam.scalar("one euro min cutoff", 1.5, 0.01, 10.0)
+            self.beta = ctx.tkparam.scalar("one euro beta", 8.0, 0.0, 50.0)
+            self.d_cutoff = ctx.tkparam.scalar("one euro d cutoff", 1.0, 0.01, 10.0)
+
+        ctx.preset_mgr.register_preset_update_callback(self.__on_update_preset)
+
+    def __on_update_preset(self, preset: Preset) -> None:
+        if not self._tunable:
+            self.min_cutoff = preset.filter["one euro min cutoff"]
+            self.beta = preset.filter["one euro beta"]
+            self.d_cutoff = preset.filter["one euro d cutoff"]
+        else:
+            self.ctx.tkparam.load_param_from_dict(preset.filter)
+
+    def apply(self, landmarks, t: float) -> Optional[LandmarkArray]:
+        """
+        Filter the landmarks of the frame captured at time t (seconds).
+        :param landmarks: detected landmarks, None if no pose was detected (resets the filter)
+        :return: landmarks with filtered hand coordinates
+        """
+        if not self.enabled:
+            return landmarks
+        if landmarks is None:
+            self.filter.reset()
+            return None
+
+        # tkparam scalars may be tuned at any time, pick up the current values
+        f = self.filter
+        f.min_cutoff = param_value(self.min_cutoff)
+        f.beta = param_value(self.beta)
+        f.d_cutoff = param_value(self.d_cutoff)
+
+        lm = LandmarkArray.from_landmarks(landmarks)
+        lm.predicted = getattr(landmarks, "predicted", False)
+        a = lm.array
+        a[self.indices, :3] = f(a[self.indices, :3], t)
+        return lm
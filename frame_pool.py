@@ -0,0 +1,96 @@
+"""
+Group: Controller Liberators
+Pool of preallocated frame buffers shared by the capture, colour conversion and display stages.
+
+Reading a camera frame and converting it to RGB used to allocate fresh full-size arrays every frame, and the
+allocator churn at 30-60 fps shows up as latency spikes. The stages now fill buffers taken from a FramePool
+(VideoCapture.read(image), cv2.cvtColor(dst=...)) and hand them back once the frame is no longer needed, so the
+same few buffers circulate by reference. OpenCV silently allocates a new array when a buffer does not fit
+(e.g. the camera ignored the requested resolution); check() counts those, and the pool adopts the new shape.
+
+Usage:
+    pool = FramePool((480, 640, 3), size=4)
+    buf = pool.acquire()
+    ret, frame = source.read(buf)
+    pool.check(buf, frame)
+    ...
+    pool.release(frame)
+    pool.end_frame()
+"""
+
+from collections import deque
+from threading import Lock
+from typing import Optional, Tuple
+import numpy as np
+
+
+class FramePool:
+    """
+    Free list of equally shaped uint8 frame buffers, acquire and release may be called from different threads.
+    """
+
+    def __init__(self, shape: Tuple[int, ...], size: int = 4):
+        """
+        :param shape: (height, width, channels) of the buffers
+        :param size: number of buffers allocated upfront
+        """
+        self.shape: Tuple[int, ...] = tuple(shape)
+        self._free: deque = deque(np.empty(self.shape, dtype=np.uint8) for _ in range(size))
+        self.buffers: int = size  # buffers created by the pool
+        self.allocations: int = 0  # buffers allocated after start-up, by the pool or by OpenCV
+        self.frames: int = 0
+        self._lock = Lock()  # guards the free list, the shape and the counters, the capture thread shares them
+
+    def acquire(self) -> np.ndarray:
+        """Take a free buffer, a new one is allocated if all are in use."""
+        with self._lock:
+            if self._free:
+                return self._free.pop()
+            self.buffers += 1
+            self.allocations += 1
+            shape = self.shape
+        return np.empty(shape, dtype=np.uint8)
+
+    def release(self, buf: Optional[np.ndarray]) -> None:
+        """
+        Hand a buffer back once no stage references it anymore.
+        Ownership rule: the stage releasing a buffer must be its last user. The buffer is overwritten by the next
+        capture, so any stage that keeps a frame (or a view of it) beyond the current loop iteration must copy it,
+        as the trace recorder, the pose process and the lane processes do; main.py releases the displayed frame
+        right after the window is updated.
+        """
+        if buf is None:
+            return
+        with self._lock:
+            if buf.shape != self.shape:
+                # Frames come in another shape than expected, switch over to it
+                self.shape = buf.shape
+                self._free.clear()
+            self._free.append(buf)
+
+    def check(self, requested: Optional[np.ndarray], returned: Optional[np.ndarray]) -> Optional[np.ndarray]:
+        """
+        Count an allocation if a stage returned another array than the buffer it was given.
+        :return: the returned array
+        """
+        if returned is not None and returned is not requested:
+            with self._lock:
+                self.allocations += 1
+        return returned
+
+    def end_frame(self) -> None:
+        self.frames += 1
+
+    @property
+    def allocations_per_frame(self) -> float:
+        return self.allocations / self.frames if self.frames else 0.0
+
+    def stats(self) -> dict:
+        """Return pool counters."""
+        return {
+            "buffers": self.buffers,
+            "free": len(self._free),
+            "allocations": self.allocations,
+            "frames": self.frames,
+            "allocations_per_frame": round(self.allocations_per_frame, 3),
+        }
@@ -4,16 +4,21 @@ This program builds a graphical user interface for visualizing pose detection an
 When receiving function calls from the main loop, the GUI instance renders corresponding graphics to the screen.
 """
 
-from typing import Optional
+from typing import Optional, Dict, List, Set, Tuple
 import os
+import signal
 import math
-from time import time as tm
+from time import time as tm, perf_counter
+import numpy as np
+import cv2
 import pygame
 from pygame.color import Color
 
 from context import Context
 from mapping import ControlFeature
 from presets import Preset
+from surface_cache import SurfaceCache
+from sprite_atlas import SpriteAtlas
 from utils import *
 
 
@@ -24,6 +29,7 @@ class GUI:
 
     UI_SCALE_FACTOR = 0.6
     UI_IMG_ROOT = "UI_Icons"
+    HUD_REFRESH_FRAMES = 15
 
     def __init__(self, ctx: Context, reso: tuple, fps: float):
         self.ctx: Context = ctx
@@ -47,34 +53,67 @@ class GUI:
         self._fps_accum_count: int = 0
         self._smoothed_fps: int = 0
 
+        # Overlay (non-calibration) refresh, decoupled from the camera frame rate
+        self.overlay_fps: float = win_cfg.getfloat("overlay_fps", fallback=0.0)
+        self.minimal_overlay: bool = win_cfg.getboolean("minimal_overlay", fallback=False)
+        self._redraw: bool = True  # whether the current loop iteration renders the GUI
+        self._full_redraw: bool = True  # clear and flip the whole window on the next rendered overlay frame
+        self._last_overlay_time: float = 0.0
+        self._blit_rects: List[pygame.Rect] = []  # screen areas blitted by the widgets of the current frame
+        self._dirty_rects: List[pygame.Rect] = []  # screen areas to push to the window in minimal overlay mode
+        self._layers: Dict[str, Tuple[object, List[pygame.Rect]]] = {}  # minimal overlay: (key, rects) per layer
+        self._touched_layers: Set[str] = set()
+        self.rendered_frames: int = 0
+        self.skipped_frames: int = 0
+        self.partial_updates: int = 0
+
+        # Load configuration parameters
+        visual_cfg = ctx.cfg["Feature.visual"]
+        pref_cfg = ctx.cfg["Preferences"]
+        self.steer_wheel_fill_color: Color = Color(visual_cfg.get("steer_wheel_fill_color"))
+        self.hud_pressure_levels: int = visual_cfg.getint("hud_pressure_levels", fallback=64)
+        self.hud_cache = SurfaceCache(visual_cfg.getint("hud_cache_size", fallback=256))
+        self.wheel_atlas_angle_step: float = visual_cfg.getfloat("wheel_atlas_angle_step", fallback=2.0)
+        self.wheel_atlas_scale_step: float = visual_cfg.getfloat("wheel_atlas_scale_step", fallback=0.02)
+        self.wheel_atlas_max_sprites: int = visual_cfg.getint("wheel_atlas_max_sprites", fallback=512)
+        self.wheel_atlas_background: bool = visual_cfg.getboolean("wheel_atlas_background", fallback=True)
+        self.wheel_atlas_max_scale: float = visual_cfg.getfloat("wheel_atlas_max_scale", fallback=4.0)
+        self.wheel_atlas_max_bytes: int = int(visual_cfg.getfloat("wheel_atlas_max_mb", fallback=64.0) * (1 << 20))
+
         self.calibration_mode = True
         set_window_topmost(True)
         self._set_calibration_mode(self.calibration_mode)
         self._load_ui_icons()
 
         # do not close tkparam window
-        if check_os() != "Darwin":
+        if self.ctx.tkparam is not None:
             ctx.tkparam.root.protocol("WM_DELETE_WINDOW", fold_tkparam_win_on_close)
 
-        # Load configuration parameters
-        visual_cfg = ctx.cfg["Feature.visual"]
-        pref_cfg = ctx.cfg["Preferences"]
         self.show_caption_fps = win_cfg.getboolean("show_caption_fps")
         self._fps_accum_target: int = win_cfg.getint("smooth_fps_accum_frames")
         self.wheel_rot_max_angle = visual_cfg.getfloat("ui_wheel_rot_max_angle")
         self.fist_center_circle_radius: int = visual_cfg.getint("fist_center_circle_radius")
         self.fist_center_circle_color: Color = Color(visual_cfg.get("fist_center_circle_color"))
-        self.steer_wheel_fill_color: Color = Color(visual_cfg.get("steer_wheel_fill_color"))
         self.brake_throttle_circle_width: int = visual_cfg.getint("brake_throttle_circle_width")
         self.brake_min_circle_color: Color = Color(visual_cfg.get("brake_min_circle_color"))
         self.brake_max_circle_color: Color = Color(visual_cfg.get("brake_max_circle_color"))
         self.throttle_min_circle_color: Color = Color(visual_cfg.get("throttle_min_circle_color"))
         self.throttle_max_circle_color: Color = Color(visual_cfg.get("throttle_max_circle_color"))
         calibration_key = pref_cfg.get("calibration_mode_toggle_key").lower()
-        self.calibration_mode_toggle_key: int = key2pygame_mapping.get(calibration_key, pygame.K_BACKSLASH)
+        self.calibration_mode_toggle_key: int = key2pygame(calibration_key, pygame.K_BACKSLASH)
+        hud_key = ctx.cfg.get("Profiler", "hud_toggle_key", fallback="p").lower()
+        self.profiler_hud_toggle_key: int = key2pygame(hud_key, pygame.K_p)
+        self.show_profiler_hud: bool = False
+        self._hud_font = None
+        self._label_font = None  # font of the player labels, multi-player mode
+        self._hud_surfaces: list = []  # rendered HUD text lines, refreshed every HUD_REFRESH_FRAMES frames
+        self._hud_frame_count: int = 0
+        self._hud_version: int = 0  # incremented whenever the HUD text is rendered again
+        self._frame_buf: Optional[np.ndarray] = None  # mirrored camera frame, shared with _frame_surface
+        self._frame_surface: Optional[pygame.Surface] = None
 
         # Tkparam
-        if check_os() == "Darwin":
+        if self.ctx.tkparam is None:
             self.show_cam_capture: float = 0.0
             self.show_pose_estimation: float = 0.0
         else:
@@ -96,7 +135,7 @@ class GUI:
         self.ctx.preset_mgr.apply_preset(preset_name)
 
     def _save_tkparam_adjustment_to_preset(self):
-        if check_os() == "Darwin":
+        if self.ctx.tkparam is None:
             return
         preset = self.ctx.active_preset
         dump = self.ctx.tkparam.dump_param_to_dict()
@@ -104,13 +143,17 @@ class GUI:
             preset.visual[k] = dump[k]
         for k in preset.mapping.keys():
             preset.mapping[k] = dump[k]
+        for k in preset.filter.keys():
+            if k in dump:
+                preset.filter[k] = dump[k]
         self.ctx.preset_mgr.save_active_to_file()
 
     def _set_calibration_mode(self, mode: bool) -> None:
         """Set calibration mode"""
-        if check_os() == "Darwin":
+        if self.ctx.tkparam is None:
             return
         self.calibration_mode = mode
+        self._full_redraw = True
         set_window_transparency(not mode)
         tkparam_win = self.ctx.tkparam.root
         if mode:
@@ -123,7 +166,7 @@ class GUI:
         """
         Called when the active preset is updated.
         """
-        if check_os() == "Darwin":
+        if self.ctx.tkparam is None:
             self.show_cam_capture: float = preset.visual["show camera capture"]
             self.show_pose_estimation: float = preset.visual["show pose estimation"]
         else:
@@ -139,6 +182,39 @@ class GUI:
         self.wheel_track_icon = self.__load_scaled_img("wheel_track.png", self.UI_SCALE_FACTOR)
         self.steer_wheel_icon = self.__load_scaled_img("steer_wheel.png", self.UI_SCALE_FACTOR)
 
+        # Dimmed backgrounds and highlighted fills of the HUD widgets, composited per frame from these
+        self.brake_icon_dimmed = self.__tinted(self.brake_icon, (255, 255, 255, 100))
+        self.brake_icon_filled = self.__tinted(self.brake_icon, (255, 255, 255, 180), blend=True)
+        self.throttle_icon_dimmed = self.__tinted(self.throttle_icon, (255, 255, 255, 100))
+        self.throttle_icon_filled = self.__tinted(self.throttle_icon, (255, 255, 255, 180), blend=True)
+        self.wheel_icon_dimmed = self.__tinted(self.wheel_icon, (255, 255, 255, 100))
+        self.wheel_icon_filled = self.__tinted(self.wheel_icon, self.steer_wheel_fill_color, blend=True)
+        self.hud_cache.clear()
+        self.steer_wheel_atlas = SpriteAtlas(self.steer_wheel_icon, self.wheel_atlas_angle_step,
+                                             self.wheel_atlas_scale_step, self.wheel_atlas_max_sprites,
+                                             self.wheel_atlas_background, self.wheel_atlas_max_scale,
+                                             self.wheel_atlas_max_bytes)
+
+    @staticmethod
+    def __tinted(icon, color, blend: bool = False):
+        """
+        Return a copy of the icon multiplied by color.
+        :param blend: alpha-blend the icon onto a transparent surface first, as the pressure fills always did
+        """
+        if icon is None:
+            return None
+        if blend:
+            tinted = pygame.Surface(icon.get_size(), pygame.SRCALPHA)
+            tinted.blit(icon, (0, 0))
+        else:
+            tinted = icon.copy()
+        tinted.fill(color, special_flags=pygame.BLEND_RGBA_MULT)
+        return tinted
+
+    def _quantize_pressure(self, pressure: float) -> float:
+        """Round a pressure to one of hud_pressure_levels steps, the key of the cached HUD surfaces."""
+        return round(min(max(pressure, 0.0), 1.0) * self.hud_pressure_levels) / self.hud_pressure_levels
+
     def __load_scaled_img(self, name: str, scale_factor: float):
         path = os.path.join(os.path.dirname(__file__), self.UI_IMG_ROOT, name)
         try:
@@ -180,24 +256,109 @@ class GUI:
         """
         self.screen.fill((0, 0, 0))  # fully transparent
 
-    @staticmethod
-    def update_display() -> None:
+    def begin_frame(self) -> bool:
+        """
+        Decide whether the GUI renders in this loop iteration and clear the screen if needed.
+        In calibration mode every frame is rendered; the overlay refreshes at overlay_fps at most and, in minimal
+        overlay mode, only redraws (and pushes to the window) the widgets whose values changed.
+        :return: whether the render calls of this iteration draw anything
+        """
+        self._blit_rects = []
+        self._touched_layers.clear()
+        if self.calibration_mode:
+            self._redraw = True
+        else:
+            now = perf_counter()
+            self._redraw = self.overlay_fps <= 0 or now - self._last_overlay_time >= 1.0 / self.overlay_fps
+            if self._redraw:
+                self._last_overlay_time = now
+
+        if not self._redraw:
+            self.skipped_frames += 1
+            return False
+        self.rendered_frames += 1
+        if self.calibration_mode or not self.minimal_overlay or self._full_redraw:
+            self.clear_color()
+            self._layers.clear()
+        return True
+
+    def _update_layer(self, name: str, key, draw) -> None:
+        """
+        Minimal overlay: redraw a layer of widgets only if its key changed since it was last drawn.
+        :param key: hashable summary of everything the layer depends on
+        :param draw: function drawing the layer
+        """
+        self._touched_layers.add(name)
+        if not self.minimal_overlay or self.calibration_mode:
+            draw()
+            return
+        layer = self._layers.get(name)
+        if layer is not None and layer[0] == key:
+            return
+        old_rects = self.__clear_layer(name)
+        self._blit_rects = []
+        draw()
+        rects, self._blit_rects = self._blit_rects, []
+        self._layers[name] = (key, rects)
+        self._dirty_rects.extend(old_rects + rects)
+
+    def __clear_layer(self, name: str) -> List[pygame.Rect]:
+        _, rects = self._layers.pop(name, (None, []))
+        for rect in rects:
+            self.screen.fill((0, 0, 0), rect)
+        return rects
+
+    def update_display(self) -> None:
         """
         Update the display with the rendered graphics.
         """
-        pygame.display.flip()
+        if not self._redraw:
+            return
+        if self.calibration_mode or not self.minimal_overlay or self._full_redraw:
+            pygame.display.flip()
+            self._full_redraw = False
+            self._dirty_rects = []
+            return
+
+        # Widgets not drawn in this frame (e.g. no pose detected) disappear
+        for name in [name for name in self._layers if name not in self._touched_layers]:
+            self._dirty_rects.extend(self.__clear_layer(name))
+        if self._dirty_rects:
+            pygame.display.update(self._dirty_rects)
+            self.partial_updates += 1
+            self._dirty_rects = []
+
+    def display_stats(self) -> dict:
+        """Return GUI refresh counters."""
+        return {
+            "rendered": self.rendered_frames,
+            "skipped": self.skipped_frames,
+            "partial_updates": self.partial_updates,
+        }
 
     def render_np_frame(self, np_frame) -> None:
         """
-        Visualize the webcam capture to the screen.
+        Visualize the webcam capture to the screen, mirrored horizontally.
+        The frame is flipped straight into a persistent buffer that a surface shares its pixels with, so no surface
+        is allocated per frame.
+        :param np_frame: (height, width, 3) uint8 RGB frame
         """
         if not self.calibration_mode or (not self.show_cam_capture and not self.show_pose_estimation):
             return
-        frame = pygame.surfarray.make_surface(np_frame)
-        frame = pygame.transform.rotate(frame, -90)
-        self.screen.blit(frame, (0, 0))
-
-    def render_pose_features(self, f: ControlFeature):
+        if not self._redraw:
+            return
+        if self._frame_buf is None or self._frame_buf.shape != np_frame.shape:
+            h, w = np_frame.shape[:2]
+            self._frame_buf = np.empty((h, w, 3), dtype=np.uint8)
+            self._frame_surface = pygame.image.frombuffer(self._frame_buf, (w, h), "RGB")
+        cv2.flip(np_frame, 1, dst=self._frame_buf)
+        self.screen.blit(self._frame_surface, (0, 0))
+
+    def render_pose_features(self, f: ControlFeature, label: Optional[str] = None):
+        """
+        Draw the virtual steering wheel between the fists and the brake and throttle circles of the features.
+        :param label: text drawn above the wheel, e.g. the player number in multi-player mode
+        """
         if not self.calibration_mode:
             return
 
@@ -208,10 +369,14 @@ class GUI:
         # Draw virtual steer wheel
         diameter = math.dist(pos_l, pos_r)
         scale_factor = diameter / self.steer_wheel_icon.get_width()
-        scaled_wheel_icon = pygame.transform.rotozoom(self.steer_wheel_icon, -f.steer_angle, scale_factor)
+        scaled_wheel_icon = self.steer_wheel_atlas.get(-f.steer_angle, scale_factor)
         center_pos = self._get_pos_from_per(f.hands_center)
         rect = scaled_wheel_icon.get_rect(center=center_pos)
         self.screen.blit(scaled_wheel_icon, rect)
+        if label:
+            text = self.hud_cache.get(("label", label), lambda: self.__label_font().render(
+                label, True, (255, 255, 255), (20, 20, 20)))
+            self.screen.blit(text, text.get_rect(midbottom=(center_pos[0], rect.top)))
 
         fist_center = (pos_l[0]+pos_r[0])//2, (pos_l[1]+pos_r[1])//2
         if self.show_pose_estimation:
@@ -221,21 +386,54 @@ class GUI:
                 self.screen, self.fist_center_circle_color, pos_r, self.fist_center_circle_radius, 0)
             width = self.brake_throttle_circle_width
             color: Color = self.brake_min_circle_color
-            r: float = self.ctx.mapper.features.brake_radius_min * self.reso[0]
+            r: float = f.brake_radius_min * self.reso[0]
             pygame.draw.circle(self.screen, color, fist_center, r, width)
             color: Color = self.brake_max_circle_color
-            r = self.ctx.mapper.features.brake_radius_max * self.reso[0]
+            r = f.brake_radius_max * self.reso[0]
             pygame.draw.circle(self.screen, color, fist_center, r, width)
             color: Color = self.throttle_min_circle_color
-            r = self.ctx.mapper.features.throttle_radius_min * self.reso[0]
+            r = f.throttle_radius_min * self.reso[0]
             pygame.draw.circle(self.screen, color, fist_center, r, width)
             color: Color = self.throttle_max_circle_color
-            r = self.ctx.mapper.features.throttle_radius_max * self.reso[0]
+            r = f.throttle_radius_max * self.reso[0]
             pygame.draw.circle(self.screen, color, fist_center, r, width)
 
+    def __label_font(self):
+        if self._label_font is None:
+            self._label_font = pygame.font.SysFont("consolas,couriernew,monospace", 24, bold=True)
+        return self._label_font
+
+    def render_profiler_hud(self) -> None:
+        """
+        Draw the per-stage p50/p95/p99 timings of the profiler in the top-left corner, toggled by the HUD key.
+        """
+        profiler = self.ctx.profiler
+        if not self.show_profiler_hud or profiler is None or not profiler.enabled or not self._redraw:
+            return
+
+        if self._hud_frame_count % self.HUD_REFRESH_FRAMES == 0:
+            if self._hud_font is None:
+                self._hud_font = pygame.font.SysFont("consolas,couriernew,monospace", 16)
+            self._hud_surfaces = [self._hud_font.render(line, True, (255, 255, 255), (20, 20, 20))
+                                  for line in profiler.hud_lines()]
+            self._hud_version += 1
+        self._hud_frame_count += 1
+
+        def draw():
+            y = 8
+            for surface in self._hud_surfaces:
+                self._blit_rects.append(self.screen.blit(surface, (8, y)))
+                y += surface.get_height()
+
+        self._update_layer("profiler_hud", self._hud_version, draw)
+
     def render_game_controls(self, feat: ControlFeature) -> None:
-        self.__render_game_controls(feat.brake_pressure, feat.throttle_pressure, feat.handbrake_active,
-                                    feat.left_pressure, feat.right_pressure)
+        if not self._redraw:
+            return
+        q = self._quantize_pressure
+        key = (q(feat.brake_pressure), q(feat.throttle_pressure), feat.handbrake_active,
+               q(feat.left_pressure), q(feat.right_pressure))
+        self._update_layer("game_controls", key, lambda: self.__render_game_controls(*key))
 
     def __render_game_controls(self,
                                brake_pressure=0.0, throttle_pressure=0.0, handbrake_active=False,
@@ -279,27 +477,26 @@ class GUI:
         """
 
         if label == "Brake":
-            icon = self.brake_icon
+            icon, dimmed_icon, filled_icon = self.brake_icon, self.brake_icon_dimmed, self.brake_icon_filled
         elif label == "Throttle":
-            icon = self.throttle_icon
+            icon, dimmed_icon, filled_icon = self.throttle_icon, self.throttle_icon_dimmed, self.throttle_icon_filled
         else:
             icon = None
             return
 
-        icon_width, icon_height = icon.get_size()
-        result_surface = pygame.Surface((icon_width, icon_height), pygame.SRCALPHA)
-        dimmed_icon = icon.copy()
-        dimmed_icon.fill((255, 255, 255, 100), special_flags=pygame.BLEND_RGBA_MULT)
-        result_surface.blit(dimmed_icon, (0, 0))
-        fill_height = int(icon_height * pressure)
+        pressure = self._quantize_pressure(pressure)
 
-        if fill_height > 0:
-            fill_surface = pygame.Surface((icon_width, fill_height), pygame.SRCALPHA)
-            fill_surface.blit(icon, (0, -(icon_height - fill_height)))
-            fill_surface.fill((255, 255, 255, 180), special_flags=pygame.BLEND_RGBA_MULT)
-            result_surface.blit(fill_surface, (0, icon_height - fill_height))
+        def build():
+            icon_width, icon_height = icon.get_size()
+            result_surface = pygame.Surface((icon_width, icon_height), pygame.SRCALPHA)
+            result_surface.blit(dimmed_icon, (0, 0))
+            fill_height = int(icon_height * pressure)
+            if fill_height > 0:
+                area = pygame.Rect(0, icon_height - fill_height, icon_width, fill_height)
+                result_surface.blit(filled_icon, area.topleft, area)
+            return result_surface
 
-        self.screen.blit(result_surface, (x, y))
+        self._blit_rects.append(self.screen.blit(self.hud_cache.get((label, pressure), build), (x, y)))
 
     def __rotate_at_pivot(self, surface, ori_rect, pivot, angle):
         """Rotate an image around a pivot point"""
@@ -328,13 +525,30 @@ class GUI:
             right_pressure: 0.0-1.0, right turn pressure (D key)
         """
 
+        left_pressure = self._quantize_pressure(left_pressure)
+        right_pressure = self._quantize_pressure(right_pressure)
+        result_surface, offset = self.hud_cache.get(("Wheel", left_pressure, right_pressure),
+                                                    lambda: self.__build_wheel(left_pressure, right_pressure))
+        result_surface_rect = result_surface.get_rect(topleft=(x + offset[0], y + offset[1]))
+
+        icon_width, icon_height = self.wheel_icon.get_size()
+        wheel_track_rect = self.wheel_track_icon.get_rect()
+        wheel_track_rect.midbottom = x + icon_width // 2, y + icon_height
+        wheel_track_rect.y += wheel_track_rect.height * 0.2
+
+        self._blit_rects.append(self.screen.blit(result_surface, result_surface_rect))
+        self._blit_rects.append(self.screen.blit(self.wheel_track_icon, wheel_track_rect))
+
+    def __build_wheel(self, left_pressure, right_pressure):
+        """
+        Composite and rotate the wheel of the given pressures.
+        :return: (surface, offset of its top left corner from the wheel position)
+        """
         icon_width, icon_height = self.wheel_icon.get_size()
         result_surface = pygame.Surface((icon_width, icon_height), pygame.SRCALPHA)
 
         # Fill transparent background
-        dimmed_icon = self.wheel_icon.copy()
-        dimmed_icon.fill((255, 255, 255, 100), special_flags=pygame.BLEND_RGBA_MULT)
-        result_surface.blit(dimmed_icon, (0, 0))
+        result_surface.blit(self.wheel_icon_dimmed, (0, 0))
 
         center_x = icon_width // 2
 
@@ -342,20 +556,15 @@ class GUI:
         if left_pressure > 0:
             fill_width = int(center_x * left_pressure)
             if fill_width > 0:
-                fill_surface = pygame.Surface((fill_width, icon_height), pygame.SRCALPHA)
-                source_x = center_x - fill_width
-                fill_surface.blit(self.wheel_icon, (-source_x, 0))
-                fill_surface.fill(self.steer_wheel_fill_color, special_flags=pygame.BLEND_RGBA_MULT)
-                result_surface.blit(fill_surface, (center_x - fill_width, 0))
+                area = pygame.Rect(center_x - fill_width, 0, fill_width, icon_height)
+                result_surface.blit(self.wheel_icon_filled, area.topleft, area)
 
         # Fill right
         if right_pressure > 0:
             fill_width = int(center_x * right_pressure)
             if fill_width > 0:
-                fill_surface = pygame.Surface((fill_width, icon_height), pygame.SRCALPHA)
-                fill_surface.blit(self.wheel_icon, (-center_x, 0))
-                fill_surface.fill(self.steer_wheel_fill_color, special_flags=pygame.BLEND_RGBA_MULT)
-                result_surface.blit(fill_surface, (center_x, 0))
+                area = pygame.Rect(center_x, 0, fill_width, icon_height)
+                result_surface.blit(self.wheel_icon_filled, area.topleft, area)
 
         if left_pressure > 0:
             rot = left_pressure * self.wheel_rot_max_angle
@@ -365,16 +574,10 @@ class GUI:
             rot = 0
 
         result_surface_rect = result_surface.get_rect()
-        result_surface_rect.topleft = x, y
-        wheel_track_rect = self.wheel_track_icon.get_rect()
         midbottom = result_surface_rect.midbottom
-        wheel_track_rect.midbottom = midbottom
         rot_center = midbottom[0], midbottom[1]+result_surface_rect.height*11.4
         result_surface, result_surface_rect = self.__rotate_at_pivot(result_surface, result_surface_rect, rot_center, rot)
-        wheel_track_rect.y += wheel_track_rect.height * 0.2
-
-        self.screen.blit(result_surface, result_surface_rect)
-        self.screen.blit(self.wheel_track_icon, wheel_track_rect)
+        return result_surface, result_surface_rect.topleft
 
     def __draw_handbrake(self, x, y, active):
         """
@@ -434,11 +637,67 @@ class GUI:
             if e.type == pygame.KEYDOWN:
                 if e.key == self.calibration_mode_toggle_key:
                     self._set_calibration_mode(not self.calibration_mode)
+                elif e.key == self.profiler_hud_toggle_key:
+                    self.show_profiler_hud = not self.show_profiler_hud
+                    self._hud_frame_count = 0
         return True
 
-    @staticmethod
-    def quit():
+    def quit(self):
         """
         Close the pygame window and release resources
         """
+        self.steer_wheel_atlas.close()
         pygame.quit()
+
+
+class HeadlessGUI:
+    """
+    Stand-in for GUI without any window, used in headless mode. Nothing is rendered, and the main loop is asked to
+    quit on Ctrl+C instead of on closing the window.
+    """
+
+    def __init__(self, ctx: Context):
+        self.ctx: Context = ctx
+        ctx.gui = self
+        self.calibration_mode = False  # the detector does not draw on the frames
+        self.show_cam_capture = False
+        self.show_pose_estimation = False
+        self.delta_time: float = 0.0
+        self._last_tick: float = perf_counter()
+        self._interrupted: bool = False
+        signal.signal(signal.SIGINT, self.__on_interrupt)
+
+    def __on_interrupt(self, signum, frame) -> None:
+        if self._interrupted:
+            raise KeyboardInterrupt  # a second Ctrl+C quits right away
+        self._interrupted = True
+
+    def handle_events(self) -> bool:
+        return not self._interrupted
+
+    def clock_tick(self) -> float:
+        now = perf_counter()
+        self.delta_time = now - self._last_tick
+        self._last_tick = now
+        return self.delta_time
+
+    def begin_frame(self) -> bool:
+        return False
+
+    def render_np_frame(self, np_frame) -> None:
+        pass
+
+    def render_pose_features(self, f: ControlFeature, label: Optional[str] = None) -> None:
+        pass
+
+    def render_game_controls(self, feat: ControlFeature) -> None:
+        pass
+
+    def render_profiler_hud(self) -> None:
+        pass
+
+    def update_display(self) -> None:
+        pass
+
+    def quit(self) -> None:
+        signal.signal(signal.SIGINT, signal.default_int_handler)
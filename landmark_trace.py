@@ -0,0 +1,190 @@
+"""
+Group: Controller Liberators
+Compact landmark trace format for recording and replaying driving sessions.
+
+A trace file is a small header followed by fixed-stride records of TRACE_DTYPE: a float64 timestamp and the
+(33, 4) float32 (x, y, z, visibility) landmark array. Frames without a detected pose are stored as NaN landmarks.
+The recorder appends records in chunks; the reader memory-maps the file, so replaying an hour-long session
+costs almost no RAM and never loads MediaPipe.
+
+Usage:
+    python landmark_trace.py session.cltrace            # replay through the mapper with the default preset
+    python landmark_trace.py session.cltrace -p sports-car
+"""
+
+from typing import Iterator, Optional, Tuple
+from time import perf_counter
+import os
+import struct
+import numpy as np
+
+from landmarks import LANDMARK_SHAPE, LandmarkArray, landmarks_to_array
+
+TRACE_MAGIC = b"CLTRACE\0"
+TRACE_VERSION = 1
+_HEADER = struct.Struct("<8sII")  # magic, version, record size
+HEADER_SIZE = _HEADER.size
+
+TRACE_DTYPE = np.dtype([
+    ("t", "<f8"),  # timestamp in seconds since the start of the recording
+    ("landmarks", "<f4", LANDMARK_SHAPE),  # (x, y, z, visibility) per landmark, NaN if no pose detected
+])
+"""Record layout of a trace file"""
+
+
+class TraceRecorder:
+    """
+    Append landmarks to a trace file, buffering records in fixed size chunks.
+    """
+
+    def __init__(self, path: str, chunk_size: int = 256):
+        """
+        :param path: trace file to create (overwritten if it exists)
+        :param chunk_size: number of records buffered before they are written to disk
+        """
+        self.path = path
+        self._file = open(path, "wb")
+        self._file.write(_HEADER.pack(TRACE_MAGIC, TRACE_VERSION, TRACE_DTYPE.itemsize))
+        self._chunk = np.empty(max(1, chunk_size), dtype=TRACE_DTYPE)
+        self._count: int = 0  # records in the current chunk
+        self._start_time: Optional[float] = None
+        self.recorded_frames: int = 0
+
+    def write(self, landmarks, timestamp: Optional[float] = None) -> None:
+        """
+        Record the landmarks of one frame.
+        :param landmarks: MediaPipe pose landmarks or LandmarkArray, None if no pose was detected
+        :param timestamp: perf_counter timestamp of the frame, defaults to now
+        """
+        if timestamp is None:
+            timestamp = perf_counter()
+        if self._start_time is None:
+            self._start_time = timestamp
+
+        self._chunk["t"][self._count] = timestamp - self._start_time
+        out = self._chunk["landmarks"][self._count]
+        if landmarks is None:
+            out[:] = np.nan
+        else:
+            landmarks_to_array(landmarks, out=out)
+
+        self._count += 1
+        self.recorded_frames += 1
+        if self._count == len(self._chunk):
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the buffered records to disk."""
+        if self._count:
+            self._file.write(self._chunk[:self._count].tobytes())
+            self._count = 0
+        self._file.flush()
+
+    def close(self) -> None:
+        """Flush the remaining records and close the file."""
+        if self._file.closed:
+            return
+        self.flush()
+        self._file.close()
+
+
+class TraceReader:
+    """
+    Memory-mapped read access to a trace file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            magic, version, record_size = _HEADER.unpack(f.read(HEADER_SIZE))
+        if magic != TRACE_MAGIC:
+            raise ValueError(f"Not a landmark trace file: {path}")
+        if version != TRACE_VERSION or record_size != TRACE_DTYPE.itemsize:
+            raise ValueError(f"Unsupported trace version {version} (record size {record_size}): {path}")
+
+        # A recording interrupted mid-write may end with a partial record, ignore it
+        count = (os.path.getsize(path) - HEADER_SIZE) // TRACE_DTYPE.itemsize
+        if count > 0:
+            self.records = np.memmap(path, dtype=TRACE_DTYPE, mode="r", offset=HEADER_SIZE, shape=(count,))
+        else:
+            self.records = np.empty(0, dtype=TRACE_DTYPE)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        """(N,) timestamps of all records."""
+        return self.records["t"]
+
+    @property
+    def landmarks(self) -> np.ndarray:
+        """(N, 33, 4) landmark arrays of all records, NaN where no pose was detected."""
+        return self.records["landmarks"]
+
+    @property
+    def duration(self) -> float:
+        """Recorded session length in seconds."""
+        return float(self.records["t"][-1]) if len(self.records) else 0.0
+
+    def __iter__(self) -> Iterator[Tuple[float, Optional[LandmarkArray]]]:
+        """
+        Iterate over (timestamp, landmarks) records, landmarks being None where no pose was detected.
+        The landmark arrays are read-only views into the memory-mapped file.
+        """
+        lms = self.landmarks
+        ts = self.timestamps
+        for i in range(len(self.records)):
+            lm = lms[i]
+            yield float(ts[i]), None if np.isnan(lm[0, 0]) else LandmarkArray(lm)
+
+
+def replay(reader: TraceReader, mapper, trigger: bool = False) -> Iterator:
+    """
+    Replay a trace through PoseControlMapper.extract_features, yielding (timestamp, ControlFeature) per record.
+    :param reader: opened trace
+    :param mapper: PoseControlMapper instance
+    :param trigger: also send the controls to the mapper's gamepad, for the records with a pose
+    """
+    for t, landmarks in reader:
+        feats = mapper.extract_features(landmarks)
+        if trigger and landmarks is not None:
+            mapper.trigger_control()
+        yield t, feats
+
+
+if __name__ == "__main__":
+    import argparse
+    import configparser
+    from context import Context
+    from presets import PresetManager
+    from mapping import PoseControlMapper
+
+    parser = argparse.ArgumentParser(description="Replay a landmark trace through the pose-control mapper")
+    parser.add_argument("trace", help="trace file recorded with main.py --record")
+    parser.add_argument("-p", "--preset", help="preset to apply, defaults to [Preferences] default_preset")
+    args = parser.parse_args()
+
+    config = configparser.ConfigParser()
+    config.read("sysconfig.ini")
+    ctx = Context(config, tkparam=False)
+    preset_mgr = PresetManager(ctx)
+    mapper = PoseControlMapper(ctx)
+    preset_mgr.load_presets()
+    if args.preset:
+        preset_mgr.apply_preset(args.preset)
+
+    trace = TraceReader(args.trace)
+    steer_sum = throttle_sum = brake_sum = 0.0
+    start = perf_counter()
+    for _, feats in replay(trace, mapper):
+        steer_sum += abs(feats.right_pressure - feats.left_pressure)
+        throttle_sum += feats.throttle_pressure
+        brake_sum += feats.brake_pressure
+    elapsed = perf_counter() - start
+
+    n = max(1, len(trace))
+    print(f"Replayed {len(trace)} frames ({trace.duration:.1f}s session) in {elapsed:.3f}s "
+          f"({len(trace) / max(elapsed, 1e-9):.0f} frames/s)")
+    print(f"Mean |steer|: {steer_sum / n:.4f}, throttle: {throttle_sum / n:.4f}, brake: {brake_sum / n:.4f}")
+    ctx.close()
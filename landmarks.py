@@ -0,0 +1,102 @@
+"""
+Group: Controller Liberators
+Compact landmark representation shared by the detector backends, the trace recorder and the mapper.
+
+MediaPipe returns pose landmarks as a protobuf list of 33 NormalizedLandmark messages. Outside the in-process
+detector, landmarks travel as a (33, 4) float32 array of (x, y, z, visibility) rows. LandmarkArray wraps such an
+array and exposes the same `landmarks.landmark[i].x` access used throughout the code base.
+"""
+
+from typing import Optional
+import numpy as np
+
+NUM_LANDMARKS = 33
+"""Number of pose landmarks produced by MediaPipe"""
+
+LANDMARK_FIELDS = 4
+"""Values stored per landmark: x, y, z, visibility"""
+
+LANDMARK_SHAPE = (NUM_LANDMARKS, LANDMARK_FIELDS)
+
+
+def landmarks_to_array(landmarks, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Convert pose landmarks (MediaPipe protobuf or LandmarkArray) to a (33, 4) float32 array.
+    :param landmarks: landmarks to convert
+    :param out: optional preallocated (33, 4) float32 array to write into
+    :return: the filled array
+    """
+    if isinstance(landmarks, LandmarkArray):
+        if out is None:
+            return landmarks.array
+        np.copyto(out, landmarks.array)
+        return out
+
+    if out is None:
+        out = np.empty(LANDMARK_SHAPE, dtype=np.float32)
+    out[:] = [(lm.x, lm.y, lm.z, lm.visibility) for lm in landmarks.landmark]
+    return out
+
+
+def as_landmark_array(landmarks, buf: np.ndarray) -> np.ndarray:
+    """
+    Return the (33, 4) array of the landmarks without copying when they are already array-backed,
+    otherwise convert them into the given preallocated buffer.
+    """
+    if isinstance(landmarks, LandmarkArray):
+        return landmarks.array
+    return landmarks_to_array(landmarks, out=buf)
+
+
+class _LandmarkView:
+    """
+    Read-only view on one row of a landmark array, mimicking a NormalizedLandmark message.
+    """
+    __slots__ = ("_row",)
+
+    def __init__(self, row: np.ndarray):
+        self._row = row
+
+    @property
+    def x(self) -> float:
+        return float(self._row[0])
+
+    @property
+    def y(self) -> float:
+        return float(self._row[1])
+
+    @property
+    def z(self) -> float:
+        return float(self._row[2])
+
+    @property
+    def visibility(self) -> float:
+        return float(self._row[3])
+
+
+class LandmarkArray:
+    """
+    Pose landmarks backed by a (33, 4) float32 array of (x, y, z, visibility) rows.
+    """
+
+    predicted: bool = False
+    """Whether the landmarks were extrapolated by a motion model rather than measured by MediaPipe"""
+
+    def __init__(self, array: Optional[np.ndarray] = None):
+        self.array: np.ndarray = np.zeros(LANDMARK_SHAPE, dtype=np.float32) if array is None else array
+        self.landmark = [_LandmarkView(row) for row in self.array]
+
+    @classmethod
+    def from_landmarks(cls, landmarks) -> "LandmarkArray":
+        """Create a landmark array holding a copy of the given landmarks."""
+        return cls(landmarks_to_array(landmarks).copy())
+
+    def to_proto(self):
+        """
+        Convert to a MediaPipe NormalizedLandmarkList, e.g. for drawing with mediapipe drawing utilities.
+        """
+        from mediapipe.framework.formats import landmark_pb2
+        proto = landmark_pb2.NormalizedLandmarkList()
+        for x, y, z, visibility in self.array.tolist():
+            proto.landmark.add(x=x, y=y, z=z, visibility=visibility)
+        return proto
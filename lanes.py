@@ -0,0 +1,134 @@
+"""
+Group: Controller Liberators
+Multi-player pose detection with the solutions API, one lane of the frame per player.
+
+MediaPipe Pose only ever finds a single person, so for several drivers the frame is split into equally wide
+vertical lanes, one per player, and every lane runs in a PoseProcess of its own (see pose_worker.py). The lanes
+are detected in parallel on separate cores, so adding a player does not add its inference time to the other
+players' latency. The lane a driver stands in is their identity. Lanes are numbered in display order: the
+window is mirrored, so lane 0 is the right-hand strip of the camera frame, shown on the left.
+
+The lane processes warm up together on the first frame, within a single deadline. A lane whose process died has no
+pose until its process has been restarted with the next frame.
+"""
+
+from time import perf_counter
+from typing import List, Optional, Tuple
+import numpy as np
+
+from landmarks import LandmarkArray
+from pose_worker import PoseProcess, PoseProcessError
+
+
+class LanePoseDetector:
+    """
+    Detect one pose per vertical lane of the frame, each lane in its own process.
+    """
+
+    WARMUP_TIMEOUT = 5.0
+    """Seconds to wait for the first results of all lanes together"""
+
+    MAX_RESTARTS = 3
+    """Lane process restarts within RESTART_WINDOW after which a dying process is taken as fatal"""
+
+    RESTART_WINDOW = 600.0
+    """Seconds without a restart after which earlier restarts no longer count towards MAX_RESTARTS"""
+
+    def __init__(self, pose_kwargs: dict, lanes: int, slots: int = 2):
+        """
+        :param pose_kwargs: keyword arguments for mediapipe.solutions.pose.Pose
+        :param lanes: number of lanes, i.e. players
+        :param slots: shared memory frame slots per lane process
+        """
+        self.pose_kwargs: dict = pose_kwargs
+        self.lanes: int = lanes
+        self.slots: int = slots
+        self.frame_shape: Optional[Tuple[int, int, int]] = None
+        self.bounds: List[Tuple[int, int]] = []  # (x0, x1) camera frame columns of every lane, in display order
+        self.processes: List[PoseProcess] = []
+        self._results: List[LandmarkArray] = [LandmarkArray() for _ in range(lanes)]  # full-frame landmarks
+        self.restarts: int = 0
+        self._recent_restarts: int = 0  # restarts since the last RESTART_WINDOW without one
+        self._last_restart_time: float = 0.0
+
+    def _start(self, frame_shape) -> None:
+        self.close()
+        h, w = frame_shape[:2]
+        edges = [round(w * i / self.lanes) for i in range(self.lanes + 1)]
+        self.bounds = [(edges[self.lanes - 1 - i], edges[self.lanes - i]) for i in range(self.lanes)]
+        self.processes = [PoseProcess(self.pose_kwargs, (h, x1 - x0, 3), self.slots) for x0, x1 in self.bounds]
+        self.frame_shape = tuple(frame_shape)
+
+    def _restart(self, lane: int, error: PoseProcessError) -> None:
+        """Replace the dead process of a lane, it delivers poses again once it warmed up."""
+        now = perf_counter()
+        if now - self._last_restart_time > self.RESTART_WINDOW:
+            self._recent_restarts = 0
+        self._last_restart_time = now
+        self.restarts += 1
+        self._recent_restarts += 1
+        if self._recent_restarts > self.MAX_RESTARTS:
+            raise error
+        print(f"Lane {lane}: {error}, restarting it")
+        proc = self.processes[lane]
+        proc.close()
+        self.processes[lane] = PoseProcess(self.pose_kwargs, proc.frame_shape, self.slots)
+
+    def _warm_up(self) -> None:
+        """Wait for the first result of every lane, all lanes together within WARMUP_TIMEOUT."""
+        deadline = perf_counter() + self.WARMUP_TIMEOUT
+        waiting = list(range(self.lanes))
+        while waiting and perf_counter() < deadline:
+            for lane in list(waiting):
+                try:
+                    self.processes[lane].poll(timeout=0.05)
+                except PoseProcessError as e:
+                    self._restart(lane, e)
+                    waiting.remove(lane)  # no second wait for the restarted process
+                    continue
+                if self.processes[lane].completed_frames:
+                    waiting.remove(lane)
+
+    def process(self, frame: np.ndarray) -> List[Optional[LandmarkArray]]:
+        """
+        Hand the lanes of the frame over to their processes and return the latest landmarks of every lane.
+        Inference is pipelined, so the landmarks may belong to a frame submitted slightly earlier.
+        :return: full-frame landmarks per lane in display order, None where no pose was detected
+        """
+        starting = self.frame_shape != frame.shape
+        if starting:
+            self._start(frame.shape)  # first frame or capture resolution changed
+
+        for lane, (x0, x1) in enumerate(self.bounds):
+            try:
+                self.processes[lane].poll()
+                self.processes[lane].submit(frame[:, x0:x1])
+            except PoseProcessError as e:
+                self._restart(lane, e)
+        if starting:
+            self._warm_up()
+
+        w = frame.shape[1]
+        poses: List[Optional[LandmarkArray]] = []
+        for proc, (x0, x1), out in zip(self.processes, self.bounds, self._results):
+            if proc.latest is None:
+                poses.append(None)
+                continue
+            # Map the lane coordinates back to the full frame, the process keeps its own copy
+            a = out.array
+            np.copyto(a, proc.latest.array)
+            a[:, 0] = (a[:, 0] * (x1 - x0) + x0) / w
+            a[:, 2] *= (x1 - x0) / w  # z shares the scale of x
+            poses.append(out)
+        return poses
+
+    def stats(self) -> dict:
+        """Return inference counters per lane."""
+        return {**{f"lane {i}": proc.stats() for i, proc in enumerate(self.processes)}, "restarts": self.restarts}
+
+    def close(self) -> None:
+        """Stop the lane processes."""
+        for proc in self.processes:
+            proc.close()
+        self.processes = []
+        self.frame_shape = None
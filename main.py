@@ -4,76 +4,276 @@ Main entrance of the program. The code initializes components and maintain the m
 The loop handles the process flow from image capturing to landmark detection to pose-control mapping.
 """
 
-from utils import check_os
-if check_os() == "Windows":
-    from control.gamepad import VGamepadWin
-    gamepad = VGamepadWin(skip=False)
-else:
-    from control.keyboard import KeyboardController
-    gamepad = KeyboardController()
-
+import argparse
+from time import perf_counter
+import json
+import os
 import cv2
 import configparser
+from utils import check_os
 from context import Context
 from presets import PresetManager
 from detector import Detector
-from mapping import PoseControlMapper
-from gui import GUI
-
-
-# Load configuration
-config = configparser.ConfigParser()
-config.read('sysconfig.ini')
-os_name = check_os()
-print(f"Current OS: {os_name}")
-
-# Initialize components
-ctx = Context(config)
-preset_mgr = PresetManager(ctx)
-camera = cv2.VideoCapture(0)
-CAP_SETTING = [(640, 480), 30]  # [resolution, fps]
-# RESO = [(1280, 720), 30]
-camera.set(cv2.CAP_PROP_FRAME_WIDTH, CAP_SETTING[0][0])
-camera.set(cv2.CAP_PROP_FRAME_HEIGHT, CAP_SETTING[0][1])
-gui = GUI(ctx, CAP_SETTING[0], CAP_SETTING[1])
-detector = Detector(ctx)
-mapper = PoseControlMapper(ctx)
-ctx.gamepad = gamepad
-preset_mgr.load_presets()
-
-# Main loop
-while True:
-    if not gui.handle_events():
-        print("Quit application")
-        break
-
-    gui.clock_tick()
-    gui.clear_color()
-
-    ret, frame = camera.read()
-    if not ret:
-        print("Cannot capture frame")
-        break
-
-    # Turn BGR image format to RGB and detect pose landmarks
-    frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    landmarks, frame = detector.get_landmarks(frame)
-
-    # Visualize pose detection and trigger game controls
-    if landmarks:
-        gui.render_np_frame(frame)  # Draw webcam capture
-        feats = mapper.extract_features(landmarks)  # Extract pose features
-        gui.render_pose_features(feats)  # Draw pose features on GUI
-        gui.render_game_controls(feats)  # Draw game controls based on extracted features
-        mapper.trigger_control()  # Map pose features to gamepad controls
+from players import Player
+from gui import GUI, HeadlessGUI
+from capture import CaptureWorker
+from frame_pool import FramePool
+from sources import create_frame_source, SOURCE_TYPES
+from landmark_trace import TraceRecorder
+from profiler import StageProfiler
+from output import ControlOutputThread
+from control.uinput import uinput_available
+
+
+CONTROLLER_BACKENDS = ("auto", "gamepad", "uinput", "keyboard", "null", "record")
+"""Accepted values of --controller"""
+
+
+def create_gamepad(config, backend: str = "auto", headless: bool = False, record_path: str = "controls.csv",
+                   number: int = 1, players: int = 1):
+    """
+    Create the virtual controller backend.
+    :param backend: one of CONTROLLER_BACKENDS, 'auto' picks the backend of the current OS, or 'null' when headless
+    :param record_path: CSV file of the 'record' backend, suffixed with the player number in multi-player mode
+    :param number: player number of the controller, starting at 1
+    :param players: number of players, each gets a controller of their own
+    """
+    if backend == "auto":
+        if headless:
+            backend = "null"
+        elif check_os() == "Windows":
+            backend = "gamepad"
+        elif check_os() == "Linux" and uinput_available():
+            backend = "uinput"  # analog axes instead of keys
+        else:
+            backend = "keyboard"
+    if backend == "keyboard" and players > 1:
+        raise SystemExit("The keyboard controller cannot tell players apart, use the gamepad, uinput, null or record "
+                         "controller in multi-player mode")
+    if backend == "gamepad":
+        from control.gamepad import VGamepadWin
+        return VGamepadWin(skip=False)
+    if backend == "uinput":
+        from control.uinput import UInputGamepad
+        return UInputGamepad() if players == 1 else UInputGamepad(name=f"Controller Liberator Gamepad {number}")
+    if backend == "keyboard":
+        from control.keyboard import KeyboardController
+        return KeyboardController(asynchronous=config.getboolean("Output", "keyboard_async", fallback=False),
+                                  queue_size=config.getint("Output", "keyboard_queue_size", fallback=32),
+                                  pwm_hz=config.getfloat("Output", "keyboard_pwm_hz", fallback=0.0),
+                                  pwm_min_duty=config.getfloat("Output", "keyboard_pwm_min_duty", fallback=0.05),
+                                  pwm_spin_us=config.getfloat("Output", "keyboard_pwm_spin_us", fallback=500.0),
+                                  idle_release_ms=config.getfloat("Output", "keyboard_idle_release_ms",
+                                                                  fallback=500.0))
+    from control.headless import NullController, RecordingController
+    if backend == "record":
+        if players > 1:
+            root, ext = os.path.splitext(record_path)
+            record_path = f"{root}_p{number}{ext}"
+        return RecordingController(record_path)
+    return NullController()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Controller Liberator")
+    parser.add_argument("--source", choices=SOURCE_TYPES, help="frame source, overrides [Source] type")
+    parser.add_argument("--source-path", help="video file or image directory, overrides [Source] path")
+    parser.add_argument("--unthrottled", action="store_true", default=None,
+                        help="deliver file/synthetic frames as fast as the pipeline takes them")
+    parser.add_argument("--record", metavar="PATH", help="record detected landmarks to a trace file")
+    parser.add_argument("--headless", action="store_true",
+                        help="run without pygame window and tkparam, presets are loaded from JSON only")
+    parser.add_argument("--controller", choices=CONTROLLER_BACKENDS, default="auto",
+                        help="virtual controller backend, 'auto' is the OS backend (uinput if evdev is installed "
+                             "and /dev/uinput is writable on Linux), or 'null' when headless")
+    parser.add_argument("--controller-log", metavar="PATH", default="controls.csv",
+                        help="CSV file written by the 'record' controller")
+    parser.add_argument("--players", type=int, help="number of drivers, each on a controller of their own, "
+                                                    "overrides [MultiPlayer] players")
+    parser.add_argument("--max-frames", type=int, default=0, help="quit after this many frames, 0 to run on")
+    parser.add_argument("--stats", choices=("text", "json"), default="text", help="format of the stats on exit")
+    parser.add_argument("--stats-out", metavar="PATH", help="write the stats to this file instead of stdout")
+    return parser.parse_args()
+
+
+def report_stats(stats: dict, fmt: str = "text", path: str = None) -> None:
+    """
+    Output the stats collected on exit.
+    :param stats: {section name: stats dict}
+    :param fmt: 'text' for one line per section, 'json' for a JSON document
+    :param path: file to write to, stdout if None
+    """
+    if fmt == "json":
+        text = json.dumps(stats, indent=2, default=str)
+    else:
+        lines = []
+        for name, value in stats.items():
+            if value and all(isinstance(v, dict) for v in value.values()):  # e.g. per-stage profiler timings
+                lines.append(f"{name} stats:")
+                lines.extend(f"  {key}: {row}" for key, row in value.items())
+            else:
+                lines.append(f"{name} stats: {value}")
+        text = "\n".join(lines)
+    if path:
+        with open(path, "w") as f:
+            f.write(text + "\n")
+        print(f"Stats written to {path}")
     else:
-        gui.render_np_frame(frame)
+        print(text)
+
+
+def main():
+    args = parse_args()
+
+    # Load configuration
+    config = configparser.ConfigParser()
+    config.read('sysconfig.ini')
+    num_players = max(1, args.players or config.getint("MultiPlayer", "players", fallback=1))
+    gamepads = [create_gamepad(config, args.controller, args.headless, args.controller_log, number, num_players)
+                for number in range(1, num_players + 1)]
+    os_name = check_os()
+    print(f"Current OS: {os_name}{' (headless)' if args.headless else ''}")
+    if num_players > 1:
+        print(f"Multi-player mode: {num_players} players")
+
+    # Initialize components
+    ctx = Context(config, tkparam=not args.headless)
+    profiler = ctx.profiler = StageProfiler(config.getboolean("Profiler", "enabled", fallback=False))
+    PresetManager(ctx)  # created before the GUI, which follows preset changes
+    camera = source = create_frame_source(config["Source"], args.source, args.source_path, args.unthrottled)
+    cap_cfg = config["Capture"]
+    buffer_size = cap_cfg.getint("buffer_size", fallback=2)
+    pool = None
+    if cap_cfg.getboolean("frame_pool", fallback=False):
+        # Buffers in flight: ring buffer + one being captured + the BGR and RGB frames of the main loop
+        w, h = source.resolution
+        pool = FramePool((h, w, 3), buffer_size + 3)
+    if source.live and cap_cfg.getboolean("threaded", fallback=False):  # file sources must not drop frames
+        camera = CaptureWorker(source, buffer_size, pool=pool).start()
+    gui_fps = source.fps if source.live or source.throttled else 0  # 0: no frame rate limit
+    gui = HeadlessGUI(ctx) if args.headless else GUI(ctx, source.resolution, gui_fps)
+    detector = Detector(ctx, num_players)
+    # Player 1 drives with the application context, every other player with a context of their own
+    preset_names = [name.strip() for name in config.get("MultiPlayer", "presets", fallback="").split(",")]
+    one_euro = config.getboolean("Filter", "one_euro", fallback=False)
+    players = []
+    for i, gamepad in enumerate(gamepads):
+        preset = preset_names[i] if i < len(preset_names) and preset_names[i] else None
+        players.append(Player(ctx if i == 0 else Context(config, tkparam=False), gamepad, i + 1, preset, one_euro))
+    recorder = TraceRecorder(args.record) if args.record else None
+    out_cfg = config["Output"]
+    if out_cfg.getboolean("threaded", fallback=False):
+        for player in players:
+            player.output = ControlOutputThread(player.ctx, out_cfg.getfloat("rate_hz", fallback=250.0),
+                                                out_cfg.getfloat("ramp_ms", fallback=33.0) / 1000.0).start()
+
+    # Main loop
+    frame_count = 0
+    start_time = perf_counter()
+    while True:
+        if not gui.handle_events():
+            print("Quit application")
+            break
+        if args.max_frames and frame_count >= args.max_frames:
+            break
+        frame_count += 1
+
+        gui.clock_tick()
+        gui.begin_frame()  # Clears the screen if the GUI renders in this iteration
+
+        profiler.begin()
+        buf = pool.acquire() if pool and camera is source else None  # the capture worker reads into the pool
+        ret, frame = camera.read(buf) if buf is not None else camera.read()
+        if not ret:
+            print("Cannot capture frame")
+            break
+        if buf is not None:
+            pool.check(buf, frame)
+        # Capture time of the frame, the filter derives the landmark speed from it
+        frame_time = camera.frame_timestamp if isinstance(camera, CaptureWorker) else perf_counter()
+        profiler.lap("capture")
+
+        # Turn BGR image format to RGB and detect pose landmarks
+        if pool:
+            rgb = pool.acquire()
+            rgb = pool.check(rgb, cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb))
+            pool.release(frame)  # the BGR frame is no longer needed
+            frame = rgb
+        else:
+            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        profiler.lap("cvt_color")
+        poses, frame = detector.get_poses(frame)  # Landmarks per player
+        profiler.lap("detect")
+        if recorder:
+            recorder.write(poses[0], frame_time)  # a trace holds the raw detector output of a single pose, player 1's
+            profiler.lap("record")
+        poses = [player.landmark_filter.apply(landmarks, frame_time) for player, landmarks in zip(players, poses)]
+        profiler.lap("filter")
+
+        # Visualize pose detection and trigger game controls
+        gui.render_np_frame(frame)  # Draw webcam capture
+        profiler.lap("render_np_frame")
+        for player, landmarks in zip(players, poses):
+            if not landmarks:
+                continue
+            feats = player.mapper.extract_features(landmarks)  # Extract pose features
+            profiler.lap("extract_features")
+            gui.render_pose_features(feats, player.label if num_players > 1 else None)  # Draw pose features on GUI
+            profiler.lap("render_pose_features")
+            if player.number == 1:
+                gui.render_game_controls(feats)  # Draw game controls based on extracted features, of player 1
+                profiler.lap("render_game_controls")
+            if player.output:
+                player.output.publish(player.mapper.control_state())  # Controls are sent by the output thread
+            else:
+                player.mapper.trigger_control()  # Map pose features to gamepad controls
+            profiler.lap("trigger_control")
+
+        gui.render_profiler_hud()
+        profiler.lap("render_profiler_hud")
+        gui.update_display()  # Update GUI display
+        profiler.lap("display_flip")
+        if pool:
+            pool.release(frame)  # drawn on and displayed, free for the next frame (see FramePool.release)
+            pool.end_frame()
+        profiler.end_frame()
+
+    # Release resources
+    elapsed = perf_counter() - start_time
+    stats = {"Pipeline": {"frames": frame_count, "seconds": round(elapsed, 3),
+                          "fps": round(frame_count / elapsed, 2) if elapsed > 0 else 0.0}}
+    if isinstance(camera, CaptureWorker):
+        stats["Capture"] = camera.stats()
+    camera.release()
+    if pool:
+        stats["Frame pool"] = pool.stats()
+    if recorder:
+        recorder.close()
+        print(f"Recorded {recorder.recorded_frames} frames to {recorder.path}")
+    csv_path = config.get("Profiler", "csv_path", fallback="")
+    if profiler.enabled and csv_path:
+        profiler.dump_csv(csv_path)
+    if profiler.enabled:
+        stats["Profiler"] = profiler.summary()
+    for player in players:
+        suffix = f" {player.label}" if num_players > 1 else ""
+        player.close()
+        if player.output:
+            stats["Output" + suffix] = player.output.stats()
+        gamepad = player.gamepad
+        stats["Controller" + suffix] = {"flushed_updates": gamepad.flushed_updates,
+                                        "suppressed_updates": gamepad.suppressed_updates,
+                                        **(gamepad.stats() if hasattr(gamepad, "stats") else {})}
+    if isinstance(gui, GUI):
+        stats["GUI refresh"] = gui.display_stats()
+        stats["HUD cache"] = gui.hud_cache.stats()
+        stats["Wheel atlas"] = gui.steer_wheel_atlas.stats()
+    detector.close()
+    ctx.close()
+    gui.quit()
+    report_stats(stats, args.stats, args.stats_out)
 
-    gui.update_display()  # Update GUI display
 
-# Release resources
-camera.release()
-gamepad.close()
-detector.close()
-ctx.close()
-gui.quit()
+# Guarded so that child processes spawned by the pose process do not re-run the application
+if __name__ == "__main__":
+    main()
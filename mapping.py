@@ -5,10 +5,32 @@ This program processes the pose data and maps it to control signals and send the
 
 import math
 from typing import List
+import numpy as np
 from context import Context
+from landmarks import LANDMARK_SHAPE, as_landmark_array
+from control.controller import ControlState
 from presets import Preset
 from utils import *
 
+FEATURE_DTYPE = np.dtype([
+    ("steer_angle", np.float64),
+    ("left_pressure", np.float64),
+    ("right_pressure", np.float64),
+    ("brake_pressure", np.float64),
+    ("throttle_pressure", np.float64),
+])
+"""Record layout of batch-extracted features, see PoseControlMapper.extract_features_batch"""
+
+
+def _forward_fill(values: np.ndarray, mask: np.ndarray, initial: float) -> np.ndarray:
+    """
+    Keep values where mask is True and repeat the last kept value elsewhere, `initial` before the first one.
+    Mirrors the per-frame mapper, where features not updated by a frame keep their previous value.
+    """
+    idx = np.where(mask, np.arange(len(values)), -1)
+    np.maximum.accumulate(idx, out=idx)
+    return np.where(idx >= 0, values[np.maximum(idx, 0)], initial)
+
 
 class ControlFeature:
     """
@@ -31,7 +53,7 @@ class ControlFeature:
         self.handbrake_active: bool = False  # whether handbrake is active
         # self.throttle_dist_ratio_safe_dist: float = 0.0
 
-        if check_os() == "Darwin":
+        if self.ctx.tkparam is None:
             self.steering_safe_angle: float = 0.0
             self.steering_left_border_angle: float = 0.0
             self.steering_right_border_angle: float = 0.0
@@ -78,6 +100,9 @@ class PoseControlMapper:
     mouth_indices = [9, 10]
     body_indices = [11, 12, 23, 24]
 
+    # (2, 4) index array of [left hand, right hand] landmarks for vectorized gathering
+    hands_index = np.array([left_hand_indices, right_hand_indices])
+
     def __init__(self, ctx: Context):
         self.ctx: Context = ctx
         ctx.mapper = self
@@ -87,10 +112,12 @@ class PoseControlMapper:
         self._prev_menu_pressed = False
         self._prev_y_pressed = False
 
+        self._landmark_buf = np.empty(LANDMARK_SHAPE, dtype=np.float32)  # reused landmark conversion buffer
+
         ctx.preset_mgr.register_preset_update_callback(self.__on_update_preset)
 
     def __on_update_preset(self, preset: Preset) -> None:
-        if check_os() == "Darwin":
+        if self.ctx.tkparam is None:
             f = self.features
             f.steering_safe_angle = preset.mapping["steering safe angle"]
             f.steering_left_border_angle = preset.mapping["steering left border"]
@@ -115,11 +142,9 @@ class PoseControlMapper:
             return f
 
         # Get center of hands
-        left_points = [L(landmarks, i) for i in self.left_hand_indices]
-        right_points = [L(landmarks, i) for i in self.right_hand_indices]
-
-        lcx, lcy, lcz = avg(left_points)
-        rcx, rcy, rcz = avg(right_points)
+        lm = as_landmark_array(landmarks, self._landmark_buf)
+        hand_centers = lm[self.hands_index, :2].mean(axis=1, dtype=np.float64)  # (2, 2): [left, right] x [x, y]
+        (lcx, lcy), (rcx, rcy) = hand_centers.tolist()
         f.hand_left_center = [1-lcx, lcy]
         f.hand_right_center = [1-rcx, rcy]
         f.hands_center = [1-(lcx+rcx)/2.0, (lcy+rcy)/2.0]
@@ -133,7 +158,7 @@ class PoseControlMapper:
             if f.steer_angle > 0 else 0.0
 
         # Throttle and brake
-        fist_dist = math.dist(f.hand_left_center, f.hand_right_center)
+        fist_dist = math.hypot(rcx-lcx, rcy-lcy)
         fist_radius = fist_dist * 0.5
         if fist_radius < f.brake_radius_max:  # brake
             f.brake_pressure = clamp01((f.brake_radius_max - fist_radius) / (f.brake_radius_max - f.brake_radius_min))
@@ -164,18 +189,71 @@ class PoseControlMapper:
 
         return f
 
+    def extract_features_batch(self, landmarks: np.ndarray) -> np.ndarray:
+        """
+        Extract the control features of N frames in one vectorized call, with the same semantics as calling
+        extract_features frame by frame: frames without a pose (NaN landmarks) keep the previous features, a fist
+        radius between the brake and throttle ranges keeps the previous pedal pressures, and the throttle branch
+        overrides the brake branch. The state carried into the first frame is taken from the current features,
+        which are left unchanged.
+        :param landmarks: (N, 33, 4) landmark array, e.g. TraceReader.landmarks
+        :return: (N,) structured array of FEATURE_DTYPE
+        """
+        f = self.features
+        lm = np.asarray(landmarks)
+        n = len(lm)
+        out = np.empty(n, dtype=FEATURE_DTYPE)
+        if n == 0:
+            return out
+        valid = ~np.isnan(lm[:, 0, 0])
+
+        # Get center of hands
+        hand_centers = lm[:, self.hands_index, :2].mean(axis=2, dtype=np.float64)  # (N, 2, 2)
+        lcx, lcy = hand_centers[:, 0, 0], hand_centers[:, 0, 1]
+        rcx, rcy = hand_centers[:, 1, 0], hand_centers[:, 1, 1]
+
+        safe_angle = param_value(f.steering_safe_angle)
+        left_border = param_value(f.steering_left_border_angle)
+        right_border = param_value(f.steering_right_border_angle)
+        brake_min = param_value(f.brake_radius_min)
+        brake_max = param_value(f.brake_radius_max)
+        throttle_min = param_value(f.throttle_radius_min)
+        throttle_max = param_value(f.throttle_radius_max)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # Horizontal - 0 degree; Steer right to 90 degree; Steer left to -90
+            steer_angle = np.degrees(np.arctan2(rcx-lcx, rcy-lcy)) + 90.0
+            left = np.where(steer_angle < 0, np.clip((-steer_angle-safe_angle) / left_border, 0.0, 1.0), 0.0)
+            right = np.where(steer_angle > 0, np.clip((steer_angle-safe_angle) / right_border, 0.0, 1.0), 0.0)
+
+            # Throttle and brake, the throttle branch runs after and overrides the brake branch
+            fist_radius = np.hypot(rcx-lcx, rcy-lcy) * 0.5
+            throttle_hit = fist_radius > throttle_min
+            brake_hit = (fist_radius < brake_max) & ~throttle_hit
+            brake = np.where(brake_hit, np.clip((brake_max - fist_radius) / (brake_max - brake_min), 0.0, 1.0), 0.0)
+            throttle = np.where(
+                throttle_hit, np.clip((fist_radius - throttle_min) / (throttle_max - throttle_min), 0.0, 1.0), 0.0)
+
+        out["steer_angle"] = _forward_fill(steer_angle, valid, f.steer_angle)
+        out["left_pressure"] = _forward_fill(left, valid, f.left_pressure)
+        out["right_pressure"] = _forward_fill(right, valid, f.right_pressure)
+        pedal_updated = valid & (throttle_hit | brake_hit)
+        out["brake_pressure"] = _forward_fill(brake, pedal_updated, f.brake_pressure)
+        out["throttle_pressure"] = _forward_fill(throttle, pedal_updated, f.throttle_pressure)
+        return out
+
     def trigger_control(self):
         """
         Trigger corresponding game control to the virtual controller based on the extracted features.
         """
 
-        gp = self.ctx.gamepad
-        f = self.features
-
-        # steering control
-        gp.steer(f.right_pressure - f.left_pressure)
+        self.ctx.gamepad.apply(self.control_state())
 
-        # throttle and brake
-        gp.throttle(f.throttle_pressure)
-        gp.brake(f.brake_pressure)
+    def control_state(self) -> ControlState:
+        """
+        Return the game controls of the extracted features.
+        """
+        f = self.features
+        return ControlState(steer=f.right_pressure - f.left_pressure,  # steering control
+                            throttle=f.throttle_pressure, brake=f.brake_pressure)  # throttle and brake
 
@@ -0,0 +1,106 @@
+"""
+Group: Controller Liberators
+Fixed-rate controller output decoupled from the camera frame rate.
+
+Without it, PoseControlMapper.trigger_control runs once per camera frame, so the virtual controller only updates
+at the camera rate and stalls whenever a frame is slow. ControlOutputThread instead pushes the controls to
+ctx.gamepad at its own fixed rate. The main loop publishes a new immutable snapshot of the control state per frame
+through a single reference swap (atomic under the GIL, no lock on either side), and the output thread ramps its
+values linearly towards the newest snapshot, so games polling at high rates see smooth transitions instead of
+uneven steps.
+"""
+
+from threading import Thread, Event
+from time import perf_counter, sleep
+from typing import NamedTuple, Optional
+
+from context import Context
+from control.controller import ControlState
+
+
+class ControlSnapshot(NamedTuple):
+    """Immutable control state published by the main loop."""
+    state: ControlState
+    t: float  # perf_counter timestamp of publishing
+
+
+class ControlOutputThread:
+    """
+    Push the latest published controls to the virtual controller at a fixed rate.
+    """
+
+    def __init__(self, ctx: Context, rate_hz: float = 250.0, ramp_time: float = 0.033):
+        """
+        :param rate_hz: controller update rate
+        :param ramp_time: seconds to ramp from the previous values to a newly published snapshot, 0 to step
+        """
+        self.ctx: Context = ctx
+        self.period: float = 1.0 / rate_hz
+        self.ramp_time: float = ramp_time
+
+        self._snapshot: Optional[ControlSnapshot] = None  # latest published snapshot, swapped atomically
+        self._stop = Event()
+        self._thread: Optional[Thread] = None
+
+        self.ticks: int = 0
+        self.writes: int = 0  # ticks that sent changed values to the controller
+        self.late_ticks: int = 0  # ticks started more than one period late
+
+    def publish(self, state: ControlState) -> None:
+        """Publish the latest control state, called from the main loop."""
+        self._snapshot = ControlSnapshot(state, perf_counter())
+
+    def start(self) -> "ControlOutputThread":
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = Thread(target=self._output_loop, name="ControlOutput", daemon=True)
+            self._thread.start()
+        return self
+
+    def _output_loop(self) -> None:
+        current = ControlState()  # state currently sent
+        ramp_from = current  # state when the current snapshot was received
+        target: Optional[ControlSnapshot] = None
+        next_tick = perf_counter()
+
+        while not self._stop.is_set():
+            now = perf_counter()
+            snapshot = self._snapshot
+            fresh = snapshot is not target and snapshot is not None
+            if fresh:
+                target = snapshot
+                ramp_from = current
+
+            if target is not None:
+                progress = 1.0 if self.ramp_time <= 0 else min(1.0, (now - target.t) / self.ramp_time)
+                current = ControlState(*(a + (b - a) * progress for a, b in zip(ramp_from, target.state)))
+                changed = current != self.ctx.gamepad.last_state
+                # Unchanged fresh snapshots are applied too, so backends can tell live controls from a lost pose
+                if changed or fresh:
+                    self.ctx.gamepad.apply(current)  # the backend only sends the changed fields
+                    if changed:
+                        self.writes += 1
+            self.ticks += 1
+
+            next_tick += self.period
+            delay = next_tick - perf_counter()
+            if delay > 0:
+                sleep(delay)
+            elif -delay > self.period:
+                self.late_ticks += 1
+                next_tick = perf_counter()  # do not burst to catch up
+
+    def stats(self) -> dict:
+        """Return output counters."""
+        return {
+            "ticks": self.ticks,
+            "writes": self.writes,
+            "late_ticks": self.late_ticks,
+        }
+
+    def stop(self) -> None:
+        """Stop the output thread, the controller is left with its last values."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,151 @@
+"""
+Group: Controller Liberators
+Multi-player mode: several drivers in front of one camera, each on a virtual controller of their own.
+
+Every Player owns a full control pipeline: a context with its own preset manager, landmark filter, pose-control
+mapper and controller backend (and output thread, if enabled), so drivers use different presets and their
+controls never mix. The first player shares the application context, so the calibration window and preset
+switching of the GUI act on player 1. The other players run without tkparam: their presets are chosen with
+[MultiPlayer] presets and can only be calibrated by editing the preset files, or by calibrating them as player 1.
+
+When the detector returns the poses of the whole frame in no particular order (tasks backend), PlayerTracker
+assigns them to the player slots: every pose goes to the slot whose driver was last seen nearest to it, a driver
+out of sight keeps their slot for a while, and new drivers take the free slots from left to right on screen.
+"""
+
+from typing import List, Optional, Tuple
+import math
+import numpy as np
+
+from context import Context
+from filters import LandmarkFilter
+from landmarks import LandmarkArray
+from mapping import PoseControlMapper
+from presets import PresetManager
+
+
+class PlayerTracker:
+    """
+    Keep a stable player slot for every driver across frames by matching poses to the drivers' last positions.
+    """
+
+    torso_indices = [11, 12, 23, 24]  # shoulders and hips, steadier than the hands while driving
+
+    def __init__(self, players: int, max_distance: float = 0.25, hold_frames: int = 30):
+        """
+        :param players: number of player slots
+        :param max_distance: largest torso movement between two frames still matched to the same driver,
+            as a fraction of the frame width
+        :param hold_frames: frames a driver out of sight keeps their slot before a new driver may take it
+        """
+        self.players: int = players
+        self.max_distance: float = max_distance
+        self.hold_frames: int = hold_frames
+        self.centers: List[Optional[np.ndarray]] = [None] * players  # last torso center per slot, None if free
+        self.missing: List[int] = [0] * players  # frames since the driver of a slot was last seen
+        self._y_scale: float = 1.0  # height / width of the frame, centers are measured in frame widths
+
+        self.joined: int = 0  # drivers taking a free slot
+        self.lost: int = 0  # slots freed after their driver was out of sight for hold_frames
+        self.extra_poses: int = 0  # poses ignored because every slot was taken
+
+    def _center(self, pose) -> np.ndarray:
+        center = pose.array[self.torso_indices, :2].mean(axis=0)
+        center[1] *= self._y_scale  # normalized y is a fraction of the height, max_distance one of the width
+        return center
+
+    def update(self, poses: List[LandmarkArray],
+               frame_shape: Optional[Tuple[int, ...]] = None) -> List[Optional[LandmarkArray]]:
+        """
+        Assign the poses detected in a frame to the player slots.
+        :param poses: poses of the frame in any order
+        :param frame_shape: (height, width, ...) of the frame, a square frame is assumed if None
+        :return: pose per slot, None for slots whose driver was not detected
+        """
+        if frame_shape is not None:
+            self._y_scale = frame_shape[0] / frame_shape[1]
+        slots: List[Optional[LandmarkArray]] = [None] * self.players
+        centers = [self._center(pose) for pose in poses]
+
+        # Nearest pairs of known drivers and poses first
+        pairs = []
+        for slot, last in enumerate(self.centers):
+            if last is None:
+                continue
+            for i, center in enumerate(centers):
+                distance = math.dist(last, center)
+                if distance <= self.max_distance:
+                    pairs.append((distance, slot, i))
+        assigned = set()
+        for _, slot, i in sorted(pairs):
+            if slots[slot] is None and i not in assigned:
+                slots[slot] = poses[i]
+                assigned.add(i)
+
+        # New drivers take the free slots from left to right on screen, i.e. right to left in the camera frame
+        free = [slot for slot in range(self.players) if self.centers[slot] is None]
+        for i in sorted((i for i in range(len(poses)) if i not in assigned), key=lambda i: -centers[i][0]):
+            if not free:
+                self.extra_poses += 1
+                continue
+            slot = free.pop(0)
+            slots[slot] = poses[i]
+            assigned.add(i)
+            self.joined += 1
+
+        for slot, pose in enumerate(slots):
+            if pose is not None:
+                self.centers[slot] = self._center(pose)
+                self.missing[slot] = 0
+            elif self.centers[slot] is not None:
+                self.missing[slot] += 1
+                if self.missing[slot] > self.hold_frames:
+                    self.centers[slot] = None
+                    self.lost += 1
+        return slots
+
+    def stats(self) -> dict:
+        """Return tracking counters."""
+        return {
+            "joined": self.joined,
+            "lost": self.lost,
+            "extra_poses": self.extra_poses,
+        }
+
+
+class Player:
+    """
+    Control pipeline of one driver: preset manager, landmark filter, mapper and virtual controller.
+    """
+
+    def __init__(self, ctx: Context, gamepad, number: int = 1, preset: Optional[str] = None,
+                 one_euro: bool = False):
+        """
+        :param ctx: context of the player, the application context for player 1, a new one without tkparam for
+            the other players
+        :param gamepad: virtual controller backend of the player
+        :param number: player number shown on screen, starting at 1
+        :param preset: preset name, [Preferences] default_preset if None
+        :param one_euro: One Euro filter the hand landmarks
+        """
+        self.ctx: Context = ctx
+        self.number: int = number
+        self.preset_mgr: PresetManager = ctx.preset_mgr if ctx.preset_mgr is not None else PresetManager(ctx)
+        self.mapper = PoseControlMapper(ctx)
+        self.landmark_filter = LandmarkFilter(ctx, PoseControlMapper.hand_indices, one_euro)
+        ctx.gamepad = gamepad
+        self.output = None  # ControlOutputThread of the player, if controls are sent at a fixed rate
+        self.preset_mgr.load_presets(preset)
+
+    @property
+    def gamepad(self):
+        return self.ctx.gamepad
+
+    @property
+    def label(self) -> str:
+        return f"P{self.number}"
+
+    def close(self) -> None:
+        if self.output:
+            self.output.stop()
+        self.ctx.gamepad.close()
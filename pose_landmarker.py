@@ -0,0 +1,134 @@
+"""
+Group: Controller Liberators
+Non-blocking pose inference with the MediaPipe Tasks PoseLandmarker in LIVE_STREAM mode.
+
+The legacy solutions API blocks the caller for the whole inference. In LIVE_STREAM mode frames are submitted with
+detect_async() and a monotonically increasing timestamp, MediaPipe runs the inference on its own thread and hands
+every result to a callback, which converts it to LandmarkArrays and stores them in a latest-result slot (a single
+reference swap of a (first pose, all poses) tuple, so both always come from the same result). The main loop only
+ever reads that slot, so it never waits for inference; the landmarks it gets may belong to a frame submitted
+slightly earlier. MediaPipe skips frames submitted while it is still busy, those are counted as dropped.
+
+The .task model bundles are not shipped, download them from
+https://ai.google.dev/edge/mediapipe/solutions/vision/pose_landmarker (lite, full or heavy).
+"""
+
+from collections import deque
+from threading import Lock
+from time import perf_counter
+from typing import List, Optional, Tuple
+import os
+import numpy as np
+
+from landmarks import LandmarkArray
+
+
+class AsyncPoseLandmarker:
+    """
+    PoseLandmarker running in LIVE_STREAM mode, results are polled from the latest-result slot.
+    """
+
+    def __init__(self, model_path: str, min_detection_confidence: float = 0.5,
+                 min_presence_confidence: float = 0.5, min_tracking_confidence: float = 0.5, num_poses: int = 1):
+        """
+        :param model_path: path of the pose_landmarker_*.task model bundle
+        :param num_poses: maximum number of poses detected per frame, e.g. one per player
+        """
+        import mediapipe as mp
+        from mediapipe.tasks.python import BaseOptions
+        from mediapipe.tasks.python.vision import PoseLandmarker, PoseLandmarkerOptions, RunningMode
+
+        if not os.path.isfile(model_path):
+            raise FileNotFoundError(f"Pose landmarker model not found: {model_path}, download it from "
+                                    "https://ai.google.dev/edge/mediapipe/solutions/vision/pose_landmarker")
+        self._mp = mp
+        options = PoseLandmarkerOptions(
+            base_options=BaseOptions(model_asset_path=model_path),
+            running_mode=RunningMode.LIVE_STREAM,
+            num_poses=num_poses,
+            min_pose_detection_confidence=min_detection_confidence,
+            min_pose_presence_confidence=min_presence_confidence,
+            min_tracking_confidence=min_tracking_confidence,
+            output_segmentation_masks=False,
+            result_callback=self._on_result,
+        )
+        self.landmarker = PoseLandmarker.create_from_options(options)
+
+        # (first pose, every pose) of the newest result, replaced as a whole by the callback thread
+        self._latest: Tuple[Optional[LandmarkArray], List[LandmarkArray]] = (None, [])
+        self._last_timestamp: int = -1  # timestamp of the last submitted frame
+        self._in_flight: deque = deque()  # (timestamp, submit time) of frames without a result yet
+        self._lock = Lock()  # guards _in_flight and the counters shared with the callback thread
+
+        self.submitted_frames: int = 0
+        self.received_results: int = 0
+        self.dropped_frames: int = 0  # frames MediaPipe skipped without producing a result
+        self.unread_results: int = 0  # results replaced by a newer one before the main loop read them
+        self._read: bool = True
+        self.latency: float = 0.0  # seconds from submitting a frame to receiving its result, last result
+
+    def submit(self, frame: np.ndarray) -> None:
+        """
+        Submit an RGB frame for inference without waiting for it.
+        """
+        # Timestamps must increase strictly, also when two frames are submitted within the same millisecond
+        timestamp = max(int(perf_counter() * 1000), self._last_timestamp + 1)
+        self._last_timestamp = timestamp
+        image = self._mp.Image(image_format=self._mp.ImageFormat.SRGB, data=frame)  # copies, the frame may be reused
+        with self._lock:
+            self._in_flight.append((timestamp, perf_counter()))
+            self.submitted_frames += 1
+        self.landmarker.detect_async(image, timestamp)
+
+    def _on_result(self, result, output_image, timestamp_ms: int) -> None:
+        """Result callback, called from MediaPipe's thread."""
+        poses = [LandmarkArray(np.array([(lm.x, lm.y, lm.z, lm.visibility or 0.0) for lm in pose], dtype=np.float32))
+                 for pose in result.pose_landmarks or []]
+        with self._lock:
+            while self._in_flight and self._in_flight[0][0] < timestamp_ms:
+                self._in_flight.popleft()
+                self.dropped_frames += 1
+            if self._in_flight and self._in_flight[0][0] == timestamp_ms:
+                self.latency = perf_counter() - self._in_flight.popleft()[1]
+            self.received_results += 1
+            if not self._read:
+                self.unread_results += 1
+            self._read = False
+        self._latest = (poses[0] if poses else None, poses)
+
+    @property
+    def latest(self) -> Optional[LandmarkArray]:
+        """Landmarks of the newest result, None if no pose was found."""
+        return self._latest[0]
+
+    @property
+    def latest_poses(self) -> List[LandmarkArray]:
+        """Every pose of the newest result."""
+        return self._latest[1]
+
+    def poll(self) -> Optional[LandmarkArray]:
+        """
+        Return the landmarks of the newest result without blocking.
+        """
+        self._read = True
+        return self.latest
+
+    def poll_poses(self) -> List[LandmarkArray]:
+        """
+        Return every pose of the newest result without blocking, in no particular order.
+        """
+        self._read = True
+        return self.latest_poses
+
+    def stats(self) -> dict:
+        """Return result counters."""
+        return {
+            "submitted": self.submitted_frames,
+            "received": self.received_results,
+            "dropped": self.dropped_frames,
+            "unread": self.unread_results,
+            "latency_ms": round(self.latency * 1000.0, 2),
+        }
+
+    def close(self) -> None:
+        self.landmarker.close()
@@ -0,0 +1,190 @@
+"""
+Group: Controller Liberators
+Process-backed pose inference.
+
+PoseProcess runs MediaPipe Pose in a child process so that inference gets a core of its own and no longer
+competes with pygame rendering and controller output for the GIL. Frames are handed over through
+multiprocessing.shared_memory slots (no pickling); only slot indices travel through the queues, and landmarks
+come back as a compact (33, 4) float32 array written into a second shared memory block.
+
+The only application module imported here is landmarks (numpy only), so that the spawned child stays lightweight.
+"""
+
+import multiprocessing as mproc
+from multiprocessing import shared_memory
+from queue import Empty
+from time import perf_counter
+from typing import Optional, Tuple
+import numpy as np
+
+from landmarks import LANDMARK_SHAPE, LandmarkArray, landmarks_to_array
+
+_RESULT_SIZE = int(np.prod(LANDMARK_SHAPE)) * np.dtype(np.float32).itemsize
+
+
+def _pose_worker_main(pose_kwargs: dict, frame_shm_name: str, result_shm_name: str,
+                      frame_shape: Tuple[int, int, int], slots: int, requests, responses) -> None:
+    """
+    Entry point of the child process: run MediaPipe Pose on frames found in the shared memory slots.
+    """
+    import mediapipe as mp
+
+    frame_shm = shared_memory.SharedMemory(name=frame_shm_name)
+    result_shm = shared_memory.SharedMemory(name=result_shm_name)
+    frames = np.ndarray((slots, *frame_shape), dtype=np.uint8, buffer=frame_shm.buf)
+    results = np.ndarray((slots, *LANDMARK_SHAPE), dtype=np.float32, buffer=result_shm.buf)
+    pose = mp.solutions.pose.Pose(**pose_kwargs)
+
+    try:
+        while True:
+            msg = requests.get()
+            if msg is None:  # shutdown signal
+                break
+            slot, seq = msg
+            frame = frames[slot]
+            frame.flags.writeable = False
+            detection = pose.process(frame)
+            frame.flags.writeable = True
+
+            found = detection.pose_landmarks is not None
+            if found:
+                landmarks_to_array(detection.pose_landmarks, out=results[slot])
+            responses.put((slot, seq, found))
+    finally:
+        pose.close()
+        del frames, results
+        frame_shm.close()
+        result_shm.close()
+
+
+class PoseProcessError(RuntimeError):
+    """The pose child process is no longer running."""
+
+
+class PoseProcess:
+    """
+    Pipelined pose inference in a child process with shared memory frame hand-off.
+    """
+
+    ALIVE_CHECK_INTERVAL = 0.1
+    """Seconds between checks that the child is still running while waiting for a result"""
+
+    def __init__(self, pose_kwargs: dict, frame_shape: Tuple[int, int, int], slots: int = 2):
+        """
+        :param pose_kwargs: keyword arguments for mediapipe.solutions.pose.Pose
+        :param frame_shape: (height, width, 3) shape of the RGB frames to be processed
+        :param slots: number of frame slots, i.e. maximum frames in flight
+        """
+        self.frame_shape: Tuple[int, int, int] = tuple(frame_shape)
+        self.slots: int = max(1, slots)
+
+        frame_size = int(np.prod(self.frame_shape))
+        self._frame_shm = shared_memory.SharedMemory(create=True, size=frame_size * self.slots)
+        self._result_shm = shared_memory.SharedMemory(create=True, size=_RESULT_SIZE * self.slots)
+        self._frames = np.ndarray((self.slots, *self.frame_shape), dtype=np.uint8, buffer=self._frame_shm.buf)
+        self._results = np.ndarray((self.slots, *LANDMARK_SHAPE), dtype=np.float32, buffer=self._result_shm.buf)
+        self._free_slots = list(range(self.slots))
+
+        self._seq: int = 0  # sequence number of the last submitted frame
+        self._latest_seq: int = -1  # sequence number of the latest received result
+        self.latest: Optional[LandmarkArray] = None  # latest landmarks, None if no pose detected
+        self.submitted_frames: int = 0
+        self.completed_frames: int = 0
+        self.skipped_frames: int = 0  # frames not submitted because every slot was busy
+
+        mp_ctx = mproc.get_context("spawn")
+        self._requests = mp_ctx.Queue()
+        self._responses = mp_ctx.Queue()
+        self._process = mp_ctx.Process(
+            target=_pose_worker_main, name="PoseProcess", daemon=True,
+            args=(pose_kwargs, self._frame_shm.name, self._result_shm.name,
+                  self.frame_shape, self.slots, self._requests, self._responses))
+        self._process.start()
+
+    @property
+    def alive(self) -> bool:
+        """Whether the child process is running."""
+        return self._process.is_alive()
+
+    @property
+    def exitcode(self) -> Optional[int]:
+        """Exit code of the child process, None while it is running."""
+        return self._process.exitcode
+
+    @property
+    def in_flight(self) -> int:
+        """Number of frames submitted but not yet processed."""
+        return self.slots - len(self._free_slots)
+
+    def submit(self, frame: np.ndarray) -> bool:
+        """
+        Copy the frame into a free shared memory slot and queue it for inference.
+        :return: False if every slot is busy and the frame was skipped
+        """
+        if not self._free_slots:
+            self.skipped_frames += 1
+            return False
+        slot = self._free_slots.pop()
+        np.copyto(self._frames[slot], frame)
+        self._seq += 1
+        self._requests.put((slot, self._seq))
+        self.submitted_frames += 1
+        return True
+
+    def poll(self, timeout: Optional[float] = None) -> Optional[LandmarkArray]:
+        """
+        Collect finished results and return the latest landmarks.
+        :param timeout: seconds to wait for at least one result, None to only take what is ready
+        :raises PoseProcessError: if the child is no longer running, latest is cleared first so that the last pose
+            of a dead child is never sent again
+        """
+        deadline = None if timeout is None else perf_counter() + timeout
+        while self.in_flight:
+            wait = 0.0 if deadline is None else deadline - perf_counter()
+            try:
+                if wait > 0:
+                    msg = self._responses.get(timeout=min(wait, self.ALIVE_CHECK_INTERVAL))
+                else:
+                    msg = self._responses.get_nowait()
+            except Empty:
+                if wait > 0 and self.alive:
+                    continue  # keep waiting, the child is still working on it
+                break
+            slot, seq, found = msg
+            deadline = None  # got a result, only take what else is ready
+            self._free_slots.append(slot)
+            self.completed_frames += 1
+            if seq < self._latest_seq:  # stale result overtaken by a newer one
+                continue
+            self._latest_seq = seq
+            if found:
+                if self.latest is None:
+                    self.latest = LandmarkArray()
+                np.copyto(self.latest.array, self._results[slot])
+            else:
+                self.latest = None
+        if not self.alive:
+            self.latest = None
+            raise PoseProcessError(f"Pose process exited with code {self.exitcode}")
+        return self.latest
+
+    def stats(self) -> dict:
+        """Return inference counters."""
+        return {
+            "submitted": self.submitted_frames,
+            "completed": self.completed_frames,
+            "skipped": self.skipped_frames,
+        }
+
+    def close(self) -> None:
+        """Stop the child process and release the shared memory."""
+        if self.alive:
+            self._requests.put(None)
+            self._process.join(timeout=2.0)
+            if self._process.is_alive():
+                self._process.terminate()
+        del self._frames, self._results
+        self._frame_shm.close()
+        self._frame_shm.unlink()
+        self._result_shm.close()
+        self._result_shm.unlink()
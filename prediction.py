@@ -0,0 +1,133 @@
+"""
+Group: Controller Liberators
+Landmark motion prediction between pose inferences.
+
+When the detector runs MediaPipe only every Nth frame, LandmarkPredictor extrapolates the landmarks of the frames
+in between from the recent measurements, so the mapper still receives landmarks every frame. Two motion models
+are available: a constant-velocity extrapolation of the last two measurements, and a per-coordinate
+constant-velocity Kalman filter that is less sensitive to measurement noise. Every returned LandmarkArray carries a
+`predicted` flag telling measured and extrapolated landmarks apart.
+"""
+
+from typing import Optional
+import numpy as np
+
+from landmarks import LANDMARK_SHAPE, LandmarkArray
+
+PREDICTION_MODELS = ("velocity", "kalman")
+
+
+class LandmarkPredictor:
+    """
+    Extrapolate landmark positions (x, y, z) between measurements, visibility is held.
+    """
+
+    def __init__(self, model: str = "velocity", max_horizon: float = 0.25,
+                 process_noise: float = 1.0, measurement_noise: float = 1e-4):
+        """
+        :param model: 'velocity' or 'kalman'
+        :param max_horizon: seconds after the last measurement beyond which positions are no longer extrapolated
+        :param process_noise: Kalman acceleration noise density
+        :param measurement_noise: Kalman measurement noise variance of normalized coordinates
+        """
+        if model not in PREDICTION_MODELS:
+            raise ValueError(f"Unknown prediction model '{model}', expected one of {PREDICTION_MODELS}")
+        self.model: str = model
+        self.max_horizon: float = max_horizon
+        self.q: float = process_noise
+        self.r: float = measurement_noise
+
+        self._pos = np.zeros((LANDMARK_SHAPE[0], 3), dtype=np.float64)  # last (posterior) position
+        self._vel = np.zeros_like(self._pos)  # velocity per second
+        self._visibility = np.zeros(LANDMARK_SHAPE[0], dtype=np.float32)
+        self._cov = np.zeros((3,) + self._pos.shape, dtype=np.float64)  # Kalman covariance terms pp, pv, vv
+        self._t: Optional[float] = None  # timestamp of the last measurement
+        self._has_velocity: bool = False
+
+        self.measured_frames: int = 0
+        self.predicted_frames: int = 0
+
+    @property
+    def tracking(self) -> bool:
+        """Whether there is a measurement to extrapolate from."""
+        return self._t is not None
+
+    def reset(self) -> None:
+        self._t = None
+        self._has_velocity = False
+
+    def measure(self, landmarks, t: float) -> Optional[LandmarkArray]:
+        """
+        Feed the landmarks measured at time t (None if no pose was found).
+        :return: the measured landmarks as a LandmarkArray flagged as not predicted
+        """
+        if landmarks is None:
+            self.reset()
+            return None
+        lm = LandmarkArray.from_landmarks(landmarks)
+        lm.predicted = False
+        z = lm.array[:, :3].astype(np.float64)
+        self._visibility[:] = lm.array[:, 3]
+        self.measured_frames += 1
+
+        if self._t is None:
+            self._pos[:] = z
+            self._vel[:] = 0.0
+            self._cov[0] = self.r
+            self._cov[1] = 0.0
+            self._cov[2] = 1.0
+            self._t = t
+            self._has_velocity = False
+            return lm
+
+        dt = max(t - self._t, 1e-6)
+        if self.model == "velocity":
+            self._vel[:] = (z - self._pos) / dt
+            self._pos[:] = z
+        else:
+            self.__kalman_update(z, dt)
+        self._t = t
+        self._has_velocity = True
+        return lm
+
+    def __kalman_update(self, z: np.ndarray, dt: float) -> None:
+        """Constant-velocity Kalman predict + update, vectorized over all coordinates."""
+        pp, pv, vv = self._cov
+        # Predict
+        pos = self._pos + self._vel * dt
+        q = self.q
+        pp = pp + 2.0 * dt * pv + dt * dt * vv + q * dt ** 3 / 3.0
+        pv = pv + dt * vv + q * dt ** 2 / 2.0
+        vv = vv + q * dt
+        # Update with the position measurement
+        s = pp + self.r
+        k_p = pp / s
+        k_v = pv / s
+        innovation = z - pos
+        self._pos[:] = pos + k_p * innovation
+        self._vel += k_v * innovation
+        self._cov[0] = (1.0 - k_p) * pp
+        self._cov[1] = (1.0 - k_p) * pv
+        self._cov[2] = vv - k_v * pv
+
+    def predict(self, t: float) -> Optional[LandmarkArray]:
+        """
+        Extrapolate the landmarks to time t.
+        :return: landmarks flagged as predicted, None if there is nothing to extrapolate from
+        """
+        if self._t is None:
+            return None
+        lm = LandmarkArray()
+        lm.predicted = True
+        dt = min(max(t - self._t, 0.0), self.max_horizon) if self._has_velocity else 0.0
+        lm.array[:, :3] = self._pos + self._vel * dt
+        lm.array[:, 3] = self._visibility
+        self.predicted_frames += 1
+        return lm
+
+    def stats(self) -> dict:
+        """Return prediction counters."""
+        return {
+            "measured": self.measured_frames,
+            "predicted": self.predicted_frames,
+        }
@@ -36,6 +36,13 @@ class Preset:
         }
         """Mapping settings"""
 
+        self.filter = {
+            "one euro min cutoff": 1.5,
+            "one euro beta": 8.0,
+            "one euro d cutoff": 1.0,
+        }
+        """One Euro landmark filter settings"""
+
 
 class PresetManager:
     """
@@ -98,8 +105,10 @@ class PresetManager:
         print(f"Not found preset named {name}")
         return False
 
-    def load_presets(self) -> None:
-        """Load presets from local file."""
+    def load_presets(self, default_preset: Optional[str] = None) -> None:
+        """Load presets from local file and apply the default one.
+        :param default_preset: preset to apply, [Preferences] default_preset if None
+        """
         presets = os.listdir(self.presets_path)
         preset_count: int = 0
         for preset_file in presets:
@@ -109,7 +118,7 @@ class PresetManager:
             preset_count += 1
         print(f"Loaded {preset_count} presets")
 
-        default_preset_name = self.ctx.cfg.get("Preferences", "default_preset", fallback="default")
+        default_preset_name = default_preset or self.ctx.cfg.get("Preferences", "default_preset", fallback="default")
         if not self.get_preset(default_preset_name):
             print(f"Invalid preset, using default")
             default_preset_name = "default"
@@ -125,6 +134,7 @@ class PresetManager:
         preset = Preset()
         preset.visual = raw.get("visual", preset.visual)
         preset.mapping = raw.get("mapping", preset.mapping)
+        preset.filter = raw.get("filter", preset.filter)
 
         preset.name = os.path.splitext(os.path.basename(path))[0]
         self.register_preset(preset.name, preset)
@@ -144,6 +154,7 @@ class PresetManager:
         config = dict()
         config['visual'] = preset.visual
         config['mapping'] = preset.mapping
+        config['filter'] = preset.filter
         path = os.path.join(self.presets_path, f"{name}.json")
 
         with open(path, 'w') as configfile:
@@ -0,0 +1,153 @@
+"""
+Group: Controller Liberators
+Low-overhead per-stage timing of the main loop.
+
+Every stage duration is counted into a fixed-bucket latency histogram (log-spaced buckets from 10us to 1s),
+so recording costs one bisect and one increment regardless of the session length, and p50/p95/p99 can be
+read at any time. The summary is shown by the GUI as an on-screen HUD and can be dumped to CSV on exit.
+
+Usage:
+    profiler = StageProfiler()
+    profiler.begin()
+    ret, frame = camera.read()
+    profiler.lap("capture")  # time since begin() or the previous lap
+    ...
+    profiler.end_frame()
+"""
+
+from bisect import bisect_left
+from time import perf_counter
+from typing import Dict, List
+import csv
+
+PERCENTILES = (50, 95, 99)
+
+
+class LatencyHistogram:
+    """
+    Latency histogram with fixed log-spaced buckets, values in milliseconds.
+    """
+
+    def __init__(self, min_ms: float = 0.01, max_ms: float = 1000.0, num_buckets: int = 100):
+        ratio = (max_ms / min_ms) ** (1.0 / (num_buckets - 1))
+        self.edges: List[float] = [min_ms * ratio ** i for i in range(num_buckets)]  # bucket upper edges
+        self.counts: List[int] = [0] * (num_buckets + 1)  # the last bucket collects values above max_ms
+        self.count: int = 0
+        self.total_ms: float = 0.0
+        self.max_ms: float = 0.0
+
+    def record(self, ms: float) -> None:
+        """Count one latency value in milliseconds."""
+        self.counts[bisect_left(self.edges, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    @property
+    def mean_ms(self) -> float:
+        return self.total_ms / self.count if self.count else 0.0
+
+    def percentile(self, p: float) -> float:
+        """
+        Estimate the p-th percentile in milliseconds, interpolating geometrically inside the bucket.
+        """
+        if not self.count:
+            return 0.0
+        rank = p / 100.0 * self.count
+        cumulative = 0
+        for i, c in enumerate(self.counts):
+            if c and cumulative + c >= rank:
+                if i >= len(self.edges):
+                    return self.max_ms
+                upper = self.edges[i]
+                lower = self.edges[i - 1] if i > 0 else 0.0
+                frac = (rank - cumulative) / c
+                if lower <= 0.0:
+                    return upper * frac
+                return min(lower * (upper / lower) ** frac, self.max_ms)
+            cumulative += c
+        return self.max_ms
+
+    def reset(self) -> None:
+        self.counts = [0] * len(self.counts)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+
+class StageProfiler:
+    """
+    Collect per-stage latency histograms of the main loop.
+    """
+
+    FRAME_STAGE = "frame"
+    """Name of the whole-frame stage recorded by end_frame()"""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled: bool = enabled
+        self.stages: Dict[str, LatencyHistogram] = {}  # insertion ordered, i.e. in pipeline order
+        self._frame_start: float = 0.0
+        self._lap_start: float = 0.0
+
+    def _histogram(self, stage: str) -> LatencyHistogram:
+        hist = self.stages.get(stage)
+        if hist is None:
+            hist = self.stages[stage] = LatencyHistogram()
+        return hist
+
+    def begin(self) -> None:
+        """Mark the start of a frame."""
+        if self.enabled:
+            self._frame_start = self._lap_start = perf_counter()
+
+    def lap(self, stage: str) -> None:
+        """Record the time since begin() or the previous lap as the duration of the given stage."""
+        if not self.enabled:
+            return
+        now = perf_counter()
+        self._histogram(stage).record((now - self._lap_start) * 1000.0)
+        self._lap_start = now
+
+    def record(self, stage: str, seconds: float) -> None:
+        """Record an externally measured stage duration."""
+        if self.enabled:
+            self._histogram(stage).record(seconds * 1000.0)
+
+    def end_frame(self) -> None:
+        """Record the whole frame duration since begin()."""
+        if self.enabled:
+            self._histogram(self.FRAME_STAGE).record((perf_counter() - self._frame_start) * 1000.0)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Return {stage: {count, mean, p50, p95, p99, max}} with latencies in milliseconds."""
+        ret = {}
+        for stage, hist in self.stages.items():
+            row = {"count": hist.count, "mean": hist.mean_ms}
+            for p in PERCENTILES:
+                row[f"p{p}"] = hist.percentile(p)
+            row["max"] = hist.max_ms
+            ret[stage] = row
+        return ret
+
+    def hud_lines(self) -> List[str]:
+        """Return the summary formatted as text lines for the on-screen HUD."""
+        lines = [f"{'stage':<16}{'p50':>8}{'p95':>8}{'p99':>8}  ms"]
+        for stage, row in self.summary().items():
+            lines.append(f"{stage:<16}{row['p50']:>8.2f}{row['p95']:>8.2f}{row['p99']:>8.2f}")
+        return lines
+
+    def dump_csv(self, path: str) -> None:
+        """Write the summary to a CSV file."""
+        summary = self.summary()
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(["stage", "count", "mean_ms"] + [f"p{p}_ms" for p in PERCENTILES] + ["max_ms"])
+            for stage, row in summary.items():
+                writer.writerow([stage, row["count"], f"{row['mean']:.4f}"]
+                                + [f"{row[f'p{p}']:.4f}" for p in PERCENTILES] + [f"{row['max']:.4f}"])
+        print(f"Saved stage timings: {path}")
+
+    def reset(self) -> None:
+        for hist in self.stages.values():
+            hist.reset()
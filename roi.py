@@ -0,0 +1,115 @@
+"""
+Group: Controller Liberators
+Region-of-interest tracking for the pose detector.
+
+Once a pose is found, the driver of the next frame is almost always at the same place. RoiTracker derives a
+square crop around the previous landmarks (expanded by a margin), resizes it into a preallocated buffer that is
+handed to MediaPipe instead of the full frame, and maps the returned landmarks back into full-frame normalized
+coordinates. The crop is kept still while the pose stays well inside it, so MediaPipe's own temporal smoothing is
+not disturbed by a crop that moves every frame. Without a pose the full frame is used.
+"""
+
+from typing import Optional, Tuple
+import numpy as np
+import cv2
+
+from landmarks import LandmarkArray
+
+
+class RoiTracker:
+    """
+    Crop frames around the previously detected pose and map landmarks back to the full frame.
+    """
+
+    def __init__(self, margin: float = 0.3, size: int = 320, min_visibility: float = 0.5):
+        """
+        :param margin: fraction of the landmark bounding box size added on every side
+        :param size: side length in pixels of the square buffer the crop is resized into
+        :param min_visibility: landmarks less visible than this are ignored for the bounding box
+        """
+        self.margin: float = margin
+        self.size: int = size
+        self.min_visibility: float = min_visibility
+        self.box: Optional[Tuple[int, int, int]] = None  # (x0, y0, side) of the current crop in pixels
+        self._buffer = np.empty((size, size, 3), dtype=np.uint8)
+
+        self.cropped_frames: int = 0
+        self.full_frames: int = 0
+        self.lost_count: int = 0  # times tracking was lost inside the crop
+
+    @property
+    def tracking(self) -> bool:
+        return self.box is not None
+
+    def crop(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Return the image to run inference on: the resized crop while tracking, otherwise the frame itself.
+        """
+        if self.box is None:
+            self.full_frames += 1
+            return frame
+        x0, y0, side = self.box
+        cv2.resize(frame[y0:y0 + side, x0:x0 + side], (self.size, self.size), dst=self._buffer,
+                   interpolation=cv2.INTER_AREA if side > self.size else cv2.INTER_LINEAR)
+        self.cropped_frames += 1
+        return self._buffer
+
+    def to_full_frame(self, landmarks, frame_shape) -> LandmarkArray:
+        """
+        Map landmarks detected on the current crop back to full-frame normalized coordinates.
+        """
+        lm = LandmarkArray.from_landmarks(landmarks)
+        if self.box is not None:
+            h, w = frame_shape[:2]
+            x0, y0, side = self.box
+            a = lm.array
+            a[:, 0] = (a[:, 0] * side + x0) / w
+            a[:, 1] = (a[:, 1] * side + y0) / h
+            a[:, 2] *= side / w  # z shares the scale of x
+        return lm
+
+    def update(self, landmarks: Optional[LandmarkArray], frame_shape) -> None:
+        """
+        Update the crop from the full-frame landmarks of the current frame, None if no pose was found.
+        """
+        if landmarks is None:
+            if self.box is not None:
+                self.lost_count += 1
+            self.box = None
+            return
+
+        h, w = frame_shape[:2]
+        a = landmarks.array
+        visible = a[a[:, 3] >= self.min_visibility]
+        if len(visible) < 2:
+            self.box = None
+            return
+        xs = visible[:, 0] * w
+        ys = visible[:, 1] * h
+        x_min, x_max, y_min, y_max = xs.min(), xs.max(), ys.min(), ys.max()
+
+        # Keep the current crop while the pose stays inside it and still fills a reasonable part of it
+        if self.box is not None:
+            bx, by, side = self.box
+            inside = x_min >= bx and y_min >= by and x_max <= bx + side and y_max <= by + side
+            if inside and max(x_max - x_min, y_max - y_min) > side * 0.4:
+                return
+
+        extent = max(x_max - x_min, y_max - y_min)
+        side = int(extent * (1.0 + 2.0 * self.margin))
+        if side >= min(w, h):
+            self.box = None  # the pose fills the frame, cropping would not help
+            return
+        side = max(side, 32)
+        cx, cy = (x_min + x_max) * 0.5, (y_min + y_max) * 0.5
+        x0 = int(min(max(cx - side * 0.5, 0), w - side))
+        y0 = int(min(max(cy - side * 0.5, 0), h - side))
+        self.box = (x0, y0, side)
+
+    def stats(self) -> dict:
+        """Return ROI counters."""
+        return {
+            "cropped": self.cropped_frames,
+            "full": self.full_frames,
+            "lost": self.lost_count,
+        }
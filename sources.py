@@ -0,0 +1,220 @@
+"""
+Group: Controller Liberators
+Pluggable frame sources feeding the main loop.
+
+A FrameSource hands out BGR frames through the same (ret, frame) contract as cv2.VideoCapture.read(), so the
+rest of the pipeline does not care whether frames come from a webcam, a video file, a directory of images or a
+synthetic generator. File-based and synthetic sources can run unthrottled, delivering frames as fast as the
+pipeline takes them, which makes repeatable performance measurements possible on machines without a camera.
+
+Usage:
+    from sources import create_frame_source
+
+    source = create_frame_source(config["Source"])
+    ret, frame = source.read()
+"""
+
+from abc import ABC, abstractmethod
+from time import perf_counter, sleep
+from typing import Optional, Tuple
+import os
+import numpy as np
+import cv2
+
+SOURCE_TYPES = ("camera", "video", "images", "synthetic")
+"""Accepted values of the source type setting"""
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff", ".webp")
+
+
+class FrameSource(ABC):
+    """
+    Source of BGR frames.
+    """
+
+    live: bool = False
+    """Whether frames are produced in real time (a physical device), rather than read on demand"""
+
+    def __init__(self, resolution: Tuple[int, int], fps: float, throttled: bool = True):
+        """
+        :param resolution: (width, height) of the delivered frames
+        :param fps: nominal frame rate
+        :param throttled: pace frames at the nominal frame rate, otherwise deliver them as fast as possible
+        """
+        self.resolution: Tuple[int, int] = resolution
+        self.fps: float = fps
+        self.throttled: bool = throttled
+        self.frame_index: int = 0  # number of frames delivered so far
+        self._next_due: float = 0.0
+
+    @abstractmethod
+    def _read(self, image: Optional[np.ndarray] = None) -> Tuple[bool, Optional[np.ndarray]]:
+        """Read the next frame without pacing, into image if given and it fits."""
+
+    def read(self, image: Optional[np.ndarray] = None) -> Tuple[bool, Optional[np.ndarray]]:
+        """
+        Read the next frame in BGR format.
+        :param image: preallocated buffer to read the frame into, like cv2.VideoCapture.read(image)
+        :return: (ret, frame), ret is False once the source is exhausted or failed, frame is image if it fit
+        """
+        if self.throttled and not self.live and self.fps > 0:
+            self._pace()
+        ret, frame = self._read(image)
+        if ret:
+            self.frame_index += 1
+        return ret, frame
+
+    def _pace(self) -> None:
+        """Sleep until the next frame is due at the nominal frame rate."""
+        now = perf_counter()
+        if self._next_due > now:
+            sleep(self._next_due - now)
+        else:
+            self._next_due = now  # running late, do not try to catch up
+        self._next_due += 1.0 / self.fps
+
+    def release(self) -> None:
+        """Release the source resources."""
+
+
+class CameraSource(FrameSource):
+    """
+    Live webcam capture.
+    """
+
+    live = True
+
+    def __init__(self, index: int = 0, resolution: Tuple[int, int] = (640, 480), fps: float = 30):
+        super().__init__(resolution, fps)
+        self.camera = cv2.VideoCapture(index)
+        self.camera.set(cv2.CAP_PROP_FRAME_WIDTH, resolution[0])
+        self.camera.set(cv2.CAP_PROP_FRAME_HEIGHT, resolution[1])
+
+    def _read(self, image=None):
+        return self.camera.read(image)
+
+    def release(self):
+        self.camera.release()
+
+
+class VideoFileSource(FrameSource):
+    """
+    Frames decoded from a video file.
+    """
+
+    def __init__(self, path: str, throttled: bool = True, loop: bool = False):
+        self.camera = cv2.VideoCapture(path)
+        if not self.camera.isOpened():
+            raise FileNotFoundError(f"Cannot open video file: {path}")
+        resolution = (int(self.camera.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                      int(self.camera.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+        fps = self.camera.get(cv2.CAP_PROP_FPS) or 30
+        super().__init__(resolution, fps, throttled)
+        self.path = path
+        self.loop = loop
+
+    def _read(self, image=None):
+        ret, frame = self.camera.read(image)
+        if not ret and self.loop:
+            self.camera.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.camera.read(image)
+        return ret, frame
+
+    def release(self):
+        self.camera.release()
+
+
+class ImageSequenceSource(FrameSource):
+    """
+    Frames read from a directory of images, in file name order.
+    """
+
+    def __init__(self, path: str, fps: float = 30, throttled: bool = True, loop: bool = False):
+        if not os.path.isdir(path):
+            raise FileNotFoundError(f"Image directory not found: {path}")
+        self.files = sorted(os.path.join(path, f) for f in os.listdir(path)
+                            if f.lower().endswith(IMAGE_EXTENSIONS))
+        if not self.files:
+            raise FileNotFoundError(f"No images found in: {path}")
+        first = cv2.imread(self.files[0])
+        super().__init__((first.shape[1], first.shape[0]), fps, throttled)
+        self.path = path
+        self.loop = loop
+        self._file_index: int = 0
+
+    def _read(self, image=None):
+        if self._file_index >= len(self.files):
+            if not self.loop:
+                return False, None
+            self._file_index = 0
+        frame = cv2.imread(self.files[self._file_index])
+        self._file_index += 1
+        if frame is not None and image is not None and image.shape == frame.shape:
+            np.copyto(image, frame)  # imread cannot decode in place, keep handing out the caller's buffer
+            frame = image
+        return frame is not None, frame
+
+
+class SyntheticSource(FrameSource):
+    """
+    Deterministic generated frames: a static gradient background with two moving blobs.
+    Nothing recognizable as a person, used to measure the pipeline load without any input device.
+    """
+
+    def __init__(self, resolution: Tuple[int, int] = (640, 480), fps: float = 30, throttled: bool = True,
+                 num_frames: int = 0):
+        """
+        :param num_frames: number of frames to deliver, 0 for an endless source
+        """
+        super().__init__(resolution, fps, throttled)
+        self.num_frames: int = num_frames
+        w, h = resolution
+        gradient = np.linspace(0, 255, w, dtype=np.float32)
+        self._background = np.empty((h, w, 3), dtype=np.uint8)
+        self._background[:, :, 0] = gradient
+        self._background[:, :, 1] = gradient[::-1]
+        self._background[:, :, 2] = 96
+
+    def _read(self, image=None):
+        if self.num_frames and self.frame_index >= self.num_frames:
+            return False, None
+        w, h = self.resolution
+        t = self.frame_index / (self.fps or 30.0)
+        if image is not None and image.shape == self._background.shape:
+            frame = image
+            np.copyto(frame, self._background)
+        else:
+            frame = self._background.copy()
+        radius = max(4, h // 12)
+        for phase, color in ((0.0, (40, 40, 220)), (np.pi, (220, 40, 40))):
+            cx = int(w * (0.5 + 0.25 * np.cos(t + phase)))
+            cy = int(h * (0.5 + 0.15 * np.sin(2 * t + phase)))
+            cv2.circle(frame, (cx, cy), radius, color, -1)
+        return True, frame
+
+
+def create_frame_source(cfg, source_type: Optional[str] = None, path: Optional[str] = None,
+                        unthrottled: Optional[bool] = None) -> FrameSource:
+    """
+    Create a frame source from the [Source] configuration section, command line values take precedence.
+    :param cfg: [Source] section of sysconfig.ini
+    :param source_type: one of SOURCE_TYPES, overrides the configured type
+    :param path: video file or image directory, overrides the configured path
+    :param unthrottled: deliver file/synthetic frames as fast as possible, overrides the configured value
+    """
+    source_type = (source_type or cfg.get("type", fallback="camera")).lower()
+    path = path or cfg.get("path", fallback="")
+    throttled = not (unthrottled if unthrottled is not None else cfg.getboolean("unthrottled", fallback=False))
+    loop = cfg.getboolean("loop", fallback=False)
+    resolution = (cfg.getint("width", fallback=640), cfg.getint("height", fallback=480))
+    fps = cfg.getfloat("fps", fallback=30)
+
+    if source_type == "camera":
+        return CameraSource(cfg.getint("camera_index", fallback=0), resolution, fps)
+    if source_type == "video":
+        return VideoFileSource(path, throttled, loop)
+    if source_type == "images":
+        return ImageSequenceSource(path, fps, throttled, loop)
+    if source_type == "synthetic":
+        return SyntheticSource(resolution, fps, throttled, cfg.getint("num_frames", fallback=0))
+    raise ValueError(f"Unknown frame source type '{source_type}', expected one of {SOURCE_TYPES}")
@@ -0,0 +1,120 @@
+"""
+Group: Controller Liberators
+Sprite atlas of a rotated and scaled icon, used for the virtual steering wheel drawn between the fists.
+
+pygame.transform.rotozoom is a smoothed software transform and far too expensive to run on every frame. SpriteAtlas
+renders the icon at quantized angles and scale buckets instead and keeps the sprites in a bounded LRU cache, so
+drawing becomes a lookup and a blit. Scales are clamped to [scale_step, max_scale], which bounds the number of
+scale buckets (and keeps fists touching each other from rendering at scale 0), and the cache is bounded in both
+sprites and bytes. Sprites are rendered lazily on a background thread: a missing sprite is requested together with
+its neighbouring angles (the wheel turns continuously), and the frame that missed it rotozooms the icon directly,
+as before. close() stops the thread.
+"""
+
+from queue import Queue
+from threading import Thread, Lock
+from typing import Optional, Set, Tuple
+import pygame
+
+from surface_cache import SurfaceCache
+
+PREFETCH_STEPS = 3
+"""Neighbouring angle steps rendered on either side of a requested sprite"""
+
+
+class SpriteAtlas:
+    """
+    Rotated and scaled variants of an icon, quantized by angle and scale.
+    """
+
+    def __init__(self, icon, angle_step: float = 2.0, scale_step: float = 0.02, max_sprites: int = 512,
+                 background: bool = True, max_scale: float = 4.0, max_bytes: int = 64 << 20):
+        """
+        :param icon: surface to rotate and scale
+        :param angle_step: angle quantization in degrees
+        :param scale_step: scale factor quantization
+        :param max_sprites: maximum number of sprites kept, least recently used ones are evicted
+        :param background: render missing sprites on a background thread, otherwise right away
+        :param max_scale: largest scale factor, larger ones are drawn at this scale
+        :param max_bytes: maximum pixel memory of the sprites, 0 for no limit
+        """
+        self.icon = icon
+        self.angle_step: float = angle_step
+        self.scale_step: float = scale_step
+        self.max_scale_index: int = max(1, round(max_scale / scale_step))
+        self.cache = SurfaceCache(max_sprites, max_bytes)
+        self._lock = Lock()  # guards the cache and _pending, shared with the builder thread
+
+        self._requests: Optional[Queue] = None
+        self._thread: Optional[Thread] = None
+        self._pending: Set[Tuple[int, int]] = set()
+        self.direct_renders: int = 0  # frames rotozoomed directly while their sprite was being built
+        if background:
+            self._requests = Queue()
+            self._thread = Thread(target=self._build_loop, name="SpriteAtlas", daemon=True)
+            self._thread.start()
+
+    def _key(self, angle: float, scale: float) -> Tuple[int, int]:
+        num_angles = round(360.0 / self.angle_step)
+        scale_index = min(max(round(scale / self.scale_step), 1), self.max_scale_index)
+        return round((angle % 360.0) / self.angle_step) % num_angles, scale_index
+
+    def _render(self, key: Tuple[int, int]):
+        angle_index, scale_index = key
+        return pygame.transform.rotozoom(self.icon, angle_index * self.angle_step, scale_index * self.scale_step)
+
+    def get(self, angle: float, scale: float):
+        """
+        Return the icon rotated by angle degrees (counterclockwise) and scaled by scale, both quantized.
+        """
+        key = self._key(angle, scale)
+        with self._lock:
+            sprite = self.cache.lookup(key)
+        if sprite is not None:
+            return sprite
+        if self._thread is None:
+            sprite = self._render(key)
+            with self._lock:
+                self.cache.put(key, sprite)
+            return sprite
+
+        with self._lock:
+            requested = key in self._pending
+            self._pending.add(key)
+        if not requested:
+            self._requests.put(key)
+        self.direct_renders += 1
+        return pygame.transform.rotozoom(self.icon, angle, key[1] * self.scale_step)
+
+    def _build_loop(self) -> None:
+        num_angles = round(360.0 / self.angle_step)
+        while True:
+            request = self._requests.get()
+            if request is None:  # close() was called
+                return
+            angle_index, scale_index = request
+            # The requested sprite first, then its neighbours alternating outwards
+            for offset in [0] + [o for step in range(1, PREFETCH_STEPS + 1) for o in (step, -step)]:
+                key = (angle_index + offset) % num_angles, scale_index
+                with self._lock:
+                    cached = key in self.cache
+                if not cached:
+                    sprite = self._render(key)
+                    with self._lock:
+                        self.cache.put(key, sprite)
+            with self._lock:
+                self._pending.discard((angle_index, scale_index))
+
+    def close(self) -> None:
+        """Stop the background thread, sprites are rendered right away from then on."""
+        if self._thread is not None:
+            self._requests.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def stats(self) -> dict:
+        """Return atlas counters."""
+        with self._lock:
+            stats = self.cache.stats()
+        stats["direct_renders"] = self.direct_renders
+        return stats
@@ -0,0 +1,102 @@
+"""
+Group: Controller Liberators
+Bounded LRU cache of rendered pygame surfaces.
+
+The HUD widgets are composited from the same icons every frame, although the inputs they depend on rarely change
+while the pose is steady. SurfaceCache keeps the composited surfaces keyed by their (quantized) inputs, evicts the
+least recently used ones beyond a fixed number of entries or bytes, and counts hits and misses to tell how well the
+quantization works.
+"""
+
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional
+
+
+class SurfaceCache:
+    """
+    Least recently used cache of surfaces, or anything else built from a hashable key.
+    """
+
+    def __init__(self, max_size: int = 256, max_bytes: int = 0):
+        """
+        :param max_size: maximum number of cached entries
+        :param max_bytes: maximum pixel memory of the cached surfaces, 0 for no limit
+        """
+        self.max_size: int = max_size
+        self.max_bytes: int = max_bytes
+        self.bytes: int = 0  # pixel memory of the cached surfaces
+        self._entries: OrderedDict = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+
+    def lookup(self, key: Hashable) -> Optional[object]:
+        """
+        Return the entry of the key, None on a miss.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    @staticmethod
+    def _size_of(entry) -> int:
+        """Pixel memory of a surface, 0 for other entries."""
+        if hasattr(entry, "get_bytesize"):
+            w, h = entry.get_size()
+            return entry.get_bytesize() * w * h
+        return 0
+
+    def put(self, key: Hashable, entry) -> None:
+        """
+        Store the entry of the key, evicting the least recently used entries while the cache is full.
+        """
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.bytes -= self._size_of(old)
+        self._entries[key] = entry
+        self.bytes += self._size_of(entry)
+        while len(self._entries) > self.max_size or (
+                self.max_bytes and self.bytes > self.max_bytes and len(self._entries) > 1):
+            _, evicted = self._entries.popitem(last=False)
+            self.bytes -= self._size_of(evicted)
+            self.evictions += 1
+
+    def get(self, key: Hashable, build: Callable[[], object]):
+        """
+        Return the entry of the key, built by calling build() on a miss.
+        """
+        entry = self.lookup(key)
+        if entry is None:
+            entry = build()
+            self.put(key, entry)
+        return entry
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        """Return cache counters."""
+        return {
+            "size": len(self._entries),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hit_rate, 3),
+        }